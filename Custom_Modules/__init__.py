@@ -0,0 +1,38 @@
+"""
+Hakuna Patata custom modules.
+
+Submodules are imported the first time they are accessed, so importing the
+package is cheap and heavy dependencies (sklearn, selenium, gspread, kaggle...)
+only load for the modules a job actually uses.
+
+    import hakuna_patata_modules as hp
+    hp.hp_sqlite.sql_to_df(db_path, sql_txt)  # imports hp_sqlite here
+"""
+
+import importlib as _importlib
+
+
+__all__ = [
+    'hp_baseball_data'
+    , 'hp_benchmark'
+    , 'hp_feature_store'
+    , 'hp_fuzzy'
+    , 'hp_gsheet'
+    , 'hp_id_dict'
+    , 'hp_instrument'
+    , 'hp_kaggle'
+    , 'hp_sqlite'
+    , 'sklearn_df'
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = _importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
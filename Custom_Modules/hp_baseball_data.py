@@ -5,11 +5,9 @@ This module is used to pull baseball data
 import os as _os
 import time as _time
 import urllib.parse as _urlparse
-import requests as _requests
 import io as _io
-import pandas as _pd
-from bs4 import BeautifulSoup as _BS
 from zipfile import ZipFile as _ZF
+from . import hp_instrument as _hpi
 
 
 def check_packages():
@@ -47,6 +45,7 @@ batting_params_dict = {
     , 'sort': '15,d'  # format (column_number, [d|a])
  }
 
+@_hpi.instrumented()
 def fan_graph_leaderboard_data(base_url=r"https://www.fangraphs.com/leaders.aspx", new_file_name=None, decoded_params_dict=batting_params_dict, dwnld_path='/content/fg_data', dwnld_element_id='LeaderBoard1_cmdCSV', timeout=30):
 
     check_packages()  # check if proper packages installed and if not, install them
@@ -95,6 +94,7 @@ def fan_graph_leaderboard_data(base_url=r"https://www.fangraphs.com/leaders.aspx
             else:
                 file_name = new_file_name
             _os.rename('FanGraphs Leaderboard.csv', file_name)
+            _hpi.add_bytes(_os.path.getsize(file_name))
             print(f"{file_name} successfully downloaded!!")
             break
         else:
@@ -115,7 +115,11 @@ def update_url_params(base_url, new_params):
     return new_url
 
 
+@_hpi.instrumented()
 def retro_sheet_data(base_url=r"https://www.retrosheet.org/gamelogs/index.html", year='2022', dwnld_path=r"/content/retrosheet_data"):
+    import requests as _requests
+    from bs4 import BeautifulSoup as _BS
+
     base_url = r'https://www.retrosheet.org/gamelogs/index.html'
 
     s = _requests.Session()
@@ -133,12 +137,36 @@ def retro_sheet_data(base_url=r"https://www.retrosheet.org/gamelogs/index.html",
 
         if a_text == "2021":
             get = _requests.get(a_href)
+            _hpi.add_bytes(len(get.content))
             zf = _ZF(_io.BytesIO(get.content))
             zf.extractall(dwnld_path)
 
         else:
             continue 
 
+def retro_game_log_to_df(file_path, id_dict=None):
+    """Read a Retrosheet game log text file (e.g. GL2022.TXT) into a pandas DataFrame.
+
+    Args:
+        file_path (str): path/to/GLyyyy.TXT
+        id_dict (hp_id_dict.RetroIdDict, optional): Encode *_ID columns as int32 codes and drop
+            the *_NAME columns. Defaults to None.
+
+    Returns:
+        pandas.DataFrame
+    """
+
+    import pandas as _pd
+
+    str_cols = {c: str for c in retro_game_log_cols if c.endswith(('_ID', '_NAME'))}
+    df = _pd.read_csv(file_path, header=None, names=retro_game_log_cols, dtype=str_cols)
+
+    if id_dict is not None:
+        df = id_dict.encode(df)
+
+    return df
+
+
 retro_game_log_cols = ["DT"
     , "N_GAMES"
     , "DOW"
@@ -0,0 +1,497 @@
+"""
+This module is used to benchmark the custom modules offline.
+
+Every benchmark runs against synthetic data (name lists, Retrosheet shaped
+game logs and temporary SQLite DBs) so no network access is needed. Results
+are plain dictionaries that can be saved as JSON and compared to a baseline.
+
+Run from the folder above the modules:
+    python -m Custom_Modules.hp_benchmark --out bench.json --baseline old.json
+"""
+
+import os as _os
+import io as _io
+import sys as _sys
+import json as _json
+import time as _time
+import random as _random
+import string as _string
+import platform as _platform
+import datetime as _datetime
+import functools as _functools
+import tempfile as _tempfile
+import tracemalloc as _tracemalloc
+from zipfile import ZipFile as _ZF, ZIP_DEFLATED as _ZIP_DEFLATED
+import numpy as _np
+import pandas as _pd
+
+
+_first_names = ["Aaron", "Bobby", "Carlos", "Derek", "Eddie", "Frank", "Greg", "Hank", "Ivan", "Jose"
+    , "Kevin", "Luis", "Mike", "Nolan", "Omar", "Pedro", "Ryan", "Sammy", "Tony", "Willie"]
+
+_last_names = ["Aaron", "Bonds", "Clemente", "Dimaggio", "Edmonds", "Fielder", "Gehrig", "Henderson", "Ichiro", "Jeter"
+    , "Koufax", "Larkin", "Mantle", "Nettles", "Ortiz", "Puckett", "Ripken", "Sandberg", "Thome", "Williams"]
+
+# Retrosheet game log columns that hold text rather than counts
+_retro_text_cols = {"DOW", "VISITING_TEAM", "VISITING_LEAGUE", "HOME_TEAM", "HOME_LEAGUE", "DAY/NIGHT", "COMPLT_INFO"
+    , "FORFEIT_INFO", "PROTEST_INFO", "PARK_ID", "VISITING_LINE_SCORE", "HOME_LINE_SCORE", "ADDL_INFO", "ACQUISITION_INFO"}
+
+
+def synthetic_names(n, seed=0):
+    """Create a list of random "First Last" player names.
+
+    Args:
+        n (int): Number of names to create.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: List of name strings.
+    """
+
+    rng = _random.Random(seed)
+    return [f"{rng.choice(_first_names)} {rng.choice(_last_names)}{rng.randint(0, n)}" for _ in range(n)]
+
+
+def synthetic_name_pairs(n, noise=0.3, seed=0):
+    """Create 2 name lists where the second is a noisy copy of the first.
+
+    Noise is a mix of swapped first/last name tokens and single character typos, which
+    is what fuzzy matching has to deal with when joining names from 2 sources.
+
+    Args:
+        n (int): Number of names in each list.
+        noise (float, optional): Share of names in col2 that get altered. Defaults to 0.3.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        tuple: (col1, col2) lists of name strings.
+    """
+
+    rng = _random.Random(seed)
+    col1 = synthetic_names(n, seed=seed)
+    col2 = []
+
+    for name in col1:
+        if rng.random() < noise:
+            if rng.random() < 0.5:
+                first, last = name.split(' ', 1)
+                name = f"{last} {first}"
+            else:
+                i = rng.randrange(len(name))
+                name = name[:i] + rng.choice(_string.ascii_lowercase) + name[i + 1:]
+        col2.append(name)
+
+    rng.shuffle(col2)
+    return (col1, col2)
+
+
+def synthetic_game_log(n_games, cols=None, seed=0):
+    """Create a pandas DataFrame shaped like a Retrosheet game log.
+
+    Games follow a valid schedule: every day the 30 teams are paired into 15 games, so no
+    team plays itself or twice on the same day.
+
+    Args:
+        n_games (int): Number of game rows.
+        cols (list, optional): Column names. Defaults to hp_baseball_data.retro_game_log_cols.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        pandas.DataFrame
+    """
+
+    if cols is None:
+        from .hp_baseball_data import retro_game_log_cols as cols
+
+    rng = _np.random.default_rng(seed)
+    teams = _np.array(["ANA", "BAL", "BOS", "CHA", "CLE", "DET", "HOU", "KCA", "MIN", "NYA", "OAK", "SEA", "TBA", "TEX", "TOR"
+        , "ARI", "ATL", "CHN", "CIN", "COL", "LAN", "MIA", "MIL", "NYN", "PHI", "PIT", "SDN", "SFN", "SLN", "WAS"])
+    games_per_day = len(teams) // 2
+    n_days = max(-(-n_games // games_per_day), 1)
+    days = _pd.date_range('2022-04-07', periods=n_days, freq='D').strftime('%Y%m%d').astype(int).to_numpy()
+    names = _np.array(synthetic_names(500, seed=seed))
+    ids = _np.array([f"{n.split(' ')[1][:4].lower()}{n.split(' ')[0][0].lower()}{i:03d}" for i, n in enumerate(names)])
+
+    # shuffle the teams each day and pair them off: (home, visiting), (home, visiting), ...
+    day_teams = teams[_np.argsort(rng.random((n_days, len(teams))), axis=1)]
+    schedule = {
+        "DT": _np.repeat(days, games_per_day)[:n_games]
+        , "HOME_TEAM": day_teams[:, 0::2].ravel()[:n_games]
+        , "VISITING_TEAM": day_teams[:, 1::2].ravel()[:n_games]
+    }
+
+    data = {}
+    for col in cols:
+        if col in schedule:
+            data[col] = schedule[col]
+        elif col in ("VISITING_LEAGUE", "HOME_LEAGUE"):
+            data[col] = rng.choice(["AL", "NL"], n_games)
+        elif col == "DOW":
+            data[col] = rng.choice(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], n_games)
+        elif col == "DAY/NIGHT":
+            data[col] = rng.choice(["D", "N"], n_games)
+        elif col == "PARK_ID":
+            data[col] = schedule["HOME_TEAM"].astype(object) + "01"
+        elif col.endswith("_LINE_SCORE"):
+            data[col] = rng.integers(0, 10**8, n_games).astype(str).astype(object) + "0"
+        elif col.endswith("_ID"):
+            data[col] = rng.choice(ids, n_games)
+        elif col.endswith("_NAME"):
+            data[col] = rng.choice(names, n_games)
+        elif col in _retro_text_cols:
+            data[col] = _np.full(n_games, "", dtype=object)
+        elif col == "ATTENDANCE":
+            data[col] = rng.integers(5000, 50000, n_games)
+        elif col == "GAME_TIME_MIN":
+            data[col] = rng.integers(120, 240, n_games)
+        elif col == "N_GAMES":
+            data[col] = _np.zeros(n_games, dtype=int)  # 0 = single game, 1/2 = doubleheader games
+        elif col == "LEN_GAME_OUTS":
+            data[col] = _np.full(n_games, 54)
+        elif col.endswith("_POS"):
+            data[col] = rng.integers(1, 11, n_games)
+        else:
+            data[col] = rng.integers(0, 15, n_games)
+
+    return _pd.DataFrame(data, columns=cols)
+
+
+def game_log_zip_bytes(df, file_name="GL2022.TXT"):
+    """Write a game log DataFrame as a zipped Retrosheet text file (no header row).
+
+    Args:
+        df (pandas.DataFrame): Game log DataFrame.
+        file_name (str, optional): Name of the file inside the zip. Defaults to 'GL2022.TXT'.
+
+    Returns:
+        bytes: Zip archive content, the same thing retro_sheet_data gets back from Retrosheet.
+    """
+
+    buffer = _io.BytesIO()
+    with _ZF(buffer, 'w', compression=_ZIP_DEFLATED) as zf:
+        zf.writestr(file_name, df.to_csv(header=False, index=False))
+    return buffer.getvalue()
+
+
+def _percentile(values, q):
+    return float(_np.percentile(_np.asarray(values, dtype=float), q))
+
+
+def measure(func, *args, repeat=5, warmup=1, n_items=None, nbytes=None, setup=None, **kwargs):
+    """Time a function call and record latency percentiles, throughput and peak memory.
+
+    Peak memory comes from a separate tracemalloc run so tracing doesn't skew the timings.
+
+    Args:
+        func (callable): Function to benchmark.
+        *args: Positional arguments passed to func.
+        repeat (int, optional): Number of timed calls. Defaults to 5.
+        warmup (int, optional): Untimed calls before timing. Defaults to 1.
+        n_items (int, optional): Items processed per call, used for items/sec. Defaults to None.
+        nbytes (int, optional): Bytes processed per call, used for MB/sec. Defaults to None.
+        setup (callable, optional): Called before every call, e.g. to reset a temp DB. Defaults to None.
+        **kwargs: Keyword arguments passed to func.
+
+    Returns:
+        dict: Benchmark metrics.
+    """
+
+    def _call():
+        if setup is not None:
+            setup()
+        return func(*args, **kwargs)
+
+    for _ in range(warmup):
+        _call()
+
+    latencies = []
+    for _ in range(repeat):
+        start = _time.perf_counter()
+        _call()
+        latencies.append(_time.perf_counter() - start)
+
+    was_tracing = _tracemalloc.is_tracing()
+    if not was_tracing:
+        _tracemalloc.start()
+    _tracemalloc.reset_peak()
+    _call()
+    _, peak_mem = _tracemalloc.get_traced_memory()
+    if not was_tracing:
+        _tracemalloc.stop()
+
+    mean_sec = float(_np.mean(latencies))
+    results = {
+        'repeat': repeat
+        , 'mean_sec': mean_sec
+        , 'min_sec': float(_np.min(latencies))
+        , 'max_sec': float(_np.max(latencies))
+        , 'p50_sec': _percentile(latencies, 50)
+        , 'p90_sec': _percentile(latencies, 90)
+        , 'p99_sec': _percentile(latencies, 99)
+        , 'peak_mem_bytes': int(peak_mem)
+    }
+    if n_items is not None:
+        results['n_items'] = n_items
+        results['items_per_sec'] = n_items / mean_sec if mean_sec > 0 else float('inf')
+    if nbytes is not None:
+        results['nbytes'] = nbytes
+        results['mb_per_sec'] = nbytes / 1e6 / mean_sec if mean_sec > 0 else float('inf')
+
+    return results
+
+
+def bench_fuzzy_match_df(n_names=500, repeat=5, seed=0):
+    """Benchmark hp_fuzzy.fuzzy_match_df on noisy synthetic name lists.
+
+    Args:
+        n_names (int, optional): Names in each list. Defaults to 500.
+        repeat (int, optional): Number of timed calls. Defaults to 5.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Benchmark metrics.
+    """
+
+    from .hp_fuzzy import fuzzy_match_df
+
+    col1, col2 = synthetic_name_pairs(n_names, seed=seed)
+    return measure(fuzzy_match_df, col1, col2, repeat=repeat, n_items=n_names)
+
+
+def bench_df_to_sqlite(n_rows=20000, repeat=5, seed=0):
+    """Benchmark hp_sqlite.df_to_sqlite writing a synthetic game log into a temp SQLite DB.
+
+    Args:
+        n_rows (int, optional): Game log rows. Defaults to 20000.
+        repeat (int, optional): Number of timed calls. Defaults to 5.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Benchmark metrics.
+    """
+
+    from .hp_sqlite import df_to_sqlite
+
+    df = synthetic_game_log(n_rows, seed=seed)
+    with _tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = _os.path.join(tmp_dir, 'bench.db')
+        return measure(df_to_sqlite, df, db_path, 'GAME_LOG', repeat=repeat, n_items=n_rows
+            , nbytes=int(df.memory_usage(deep=True).sum()))
+
+
+def bench_sql_to_df(n_rows=20000, repeat=5, seed=0):
+    """Benchmark hp_sqlite.sql_to_df reading a full synthetic game log table back out.
+
+    Args:
+        n_rows (int, optional): Game log rows. Defaults to 20000.
+        repeat (int, optional): Number of timed calls. Defaults to 5.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Benchmark metrics.
+    """
+
+    from .hp_sqlite import df_to_sqlite, sql_to_df
+
+    df = synthetic_game_log(n_rows, seed=seed)
+    with _tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = _os.path.join(tmp_dir, 'bench.db')
+        df_to_sqlite(df, db_path, 'GAME_LOG')
+        return measure(sql_to_df, db_path, "SELECT * FROM GAME_LOG", repeat=repeat, n_items=n_rows
+            , nbytes=_os.path.getsize(db_path))
+
+
+def bench_df_feature_union(n_rows=50000, repeat=5, seed=0):
+    """Benchmark sklearn_df.DFFeatureUnion fit_transform joining the offense/pitching/defense column groups.
+
+    Args:
+        n_rows (int, optional): Game log rows. Defaults to 50000.
+        repeat (int, optional): Number of timed calls. Defaults to 5.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Benchmark metrics.
+    """
+
+    from .sklearn_df import DFFeatureUnion, DFColumnExtractor
+
+    df = synthetic_game_log(n_rows, seed=seed)
+    col_groups = {grp: [c for c in df.columns if f'_{grp}_' in c] for grp in ('OFF', 'PIT', 'DEF')}
+    X = df[[c for cols in col_groups.values() for c in cols]].astype(float)
+
+    union = DFFeatureUnion([(grp, DFColumnExtractor(cols)) for grp, cols in col_groups.items()])
+
+    return measure(union.fit_transform, X, repeat=repeat, n_items=n_rows, nbytes=int(X.memory_usage().sum()))
+
+
+def bench_retro_game_log_ingest(n_games=20000, repeat=5, seed=0, id_dict=False):
+    """Benchmark hp_baseball_data.retro_game_log_to_df parsing an extracted Retrosheet game log.
+
+    The archive is unzipped once up front, the same way retro_sheet_data leaves it on disk.
+
+    Args:
+        n_games (int, optional): Game log rows. Defaults to 20000.
+        repeat (int, optional): Number of timed calls. Defaults to 5.
+        seed (int, optional): Random seed. Defaults to 0.
+        id_dict (bool, optional): Encode the *_ID columns with a new hp_id_dict.RetroIdDict on every call. Defaults to False.
+
+    Returns:
+        dict: Benchmark metrics.
+    """
+
+    from .hp_baseball_data import retro_game_log_to_df
+    from .hp_id_dict import RetroIdDict
+
+    content = game_log_zip_bytes(synthetic_game_log(n_games, seed=seed))
+
+    with _tempfile.TemporaryDirectory() as tmp_dir:
+        with _ZF(_io.BytesIO(content)) as zf:
+            zf.extractall(tmp_dir)
+            file_paths = [_os.path.join(tmp_dir, name) for name in zf.namelist()]
+
+        def _ingest():
+            return [retro_game_log_to_df(file_path, id_dict=RetroIdDict() if id_dict else None) for file_path in file_paths]
+
+        return measure(_ingest, repeat=repeat, n_items=n_games, nbytes=sum(_os.path.getsize(p) for p in file_paths))
+
+
+benchmarks = {
+    'fuzzy_match_df': (bench_fuzzy_match_df, 'n_names', 500)
+    , 'df_to_sqlite': (bench_df_to_sqlite, 'n_rows', 20000)
+    , 'sql_to_df': (bench_sql_to_df, 'n_rows', 20000)
+    , 'df_feature_union': (bench_df_feature_union, 'n_rows', 50000)
+    , 'retro_game_log_ingest': (bench_retro_game_log_ingest, 'n_games', 20000)
+    , 'retro_game_log_ingest_id_dict': (_functools.partial(bench_retro_game_log_ingest, id_dict=True), 'n_games', 20000)
+}
+
+
+def run_benchmarks(names=None, scale=1.0, repeat=5, seed=0, out_path=None):
+    """Run benchmarks and optionally save the results as JSON.
+
+    Benchmarks whose module dependencies aren't installed are recorded as skipped.
+
+    Args:
+        names (list, optional): Benchmark names to run. Defaults to all in `benchmarks`.
+        scale (float, optional): Multiplier for the default data sizes. Defaults to 1.0.
+        repeat (int, optional): Number of timed calls per benchmark. Defaults to 5.
+        seed (int, optional): Random seed. Defaults to 0.
+        out_path (str, optional): path/to/results.json. Defaults to None.
+
+    Returns:
+        dict: {'meta': {...}, 'results': {benchmark_name: metrics}}
+    """
+
+    names = list(benchmarks) if names is None else names
+    results = {}
+
+    for name in names:
+        func, size_arg, size = benchmarks[name]
+        try:
+            results[name] = func(**{size_arg: max(int(size * scale), 1)}, repeat=repeat, seed=seed)
+        except ImportError as e:
+            results[name] = {'skipped': str(e)}
+            print(f"{name} skipped: {e}")
+        else:
+            print(f"{name}: p50 {results[name]['p50_sec']:.4f}s, {results[name]['items_per_sec']:.1f} items/sec")
+
+    run = {
+        'meta': {
+            'timestamp': _datetime.datetime.now().isoformat(timespec='seconds')
+            , 'python': _sys.version.split()[0]
+            , 'pandas': _pd.__version__
+            , 'numpy': _np.__version__
+            , 'platform': _platform.platform()
+            , 'scale': scale
+            , 'repeat': repeat
+            , 'seed': seed
+        }
+        , 'results': results
+    }
+
+    if out_path is not None:
+        save_results(run, out_path)
+
+    return run
+
+
+def save_results(run, out_path):
+    """Save benchmark results as JSON.
+
+    Args:
+        run (dict): Output of run_benchmarks.
+        out_path (str): path/to/results.json
+    """
+
+    out_dir = _os.path.dirname(out_path)
+    if out_dir and not _os.path.exists(out_dir):
+        _os.makedirs(out_dir)
+    with open(out_path, 'w') as f:
+        _json.dump(run, f, indent=2)
+
+
+def load_results(path):
+    """Load benchmark results saved with save_results.
+
+    Args:
+        path (str): path/to/results.json
+
+    Returns:
+        dict
+    """
+
+    with open(path) as f:
+        return _json.load(f)
+
+
+def compare_results(current, baseline, metrics=('p50_sec', 'p90_sec', 'peak_mem_bytes'), tolerance=0.10):
+    """Compare 2 benchmark runs.
+
+    Args:
+        current (dict): Output of run_benchmarks.
+        baseline (dict): Output of run_benchmarks (or load_results) to compare against.
+        metrics (tuple, optional): Metrics to compare, all lower-is-better. Defaults to ('p50_sec', 'p90_sec', 'peak_mem_bytes').
+        tolerance (float, optional): Relative increase allowed before flagging a regression. Defaults to 0.10.
+
+    Returns:
+        pandas.DataFrame: One row per benchmark/metric with the percent change and a REGRESSION flag.
+    """
+
+    rows = []
+    for name, cur in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or 'skipped' in cur or 'skipped' in base:
+            continue
+        for metric in metrics:
+            if metric not in cur or metric not in base:
+                continue
+            pct_change = (cur[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+            rows.append((name, metric, base[metric], cur[metric], pct_change, pct_change > tolerance))
+
+    return _pd.DataFrame(rows, columns=['BENCHMARK', 'METRIC', 'BASELINE', 'CURRENT', 'PCT_CHANGE', 'REGRESSION'])
+
+
+def main(argv=None):
+    import argparse as _argparse
+
+    parser = _argparse.ArgumentParser(description="Run offline benchmarks for the custom modules.")
+    parser.add_argument('--names', nargs='*', choices=list(benchmarks), help="Benchmarks to run (default all).")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier for the default data sizes.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed calls per benchmark.")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic data.")
+    parser.add_argument('--out', default=None, help="path/to/results.json")
+    parser.add_argument('--baseline', default=None, help="path/to/baseline.json to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Relative slowdown flagged as a regression.")
+    args = parser.parse_args(argv)
+
+    run = run_benchmarks(names=args.names, scale=args.scale, repeat=args.repeat, seed=args.seed, out_path=args.out)
+
+    if args.baseline is not None:
+        comparison = compare_results(run, load_results(args.baseline), tolerance=args.tolerance)
+        print(comparison.to_string(index=False))
+        if comparison['REGRESSION'].any():
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    _sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+This module is used to keep rolling team features built from Retrosheet game logs.
+
+Each game log row (see hp_baseball_data.retro_game_log_cols) is split into a home
+and a visiting team-game record. Rolling averages over the last N games are kept in
+SQLite and updated incrementally: adding a day of games only reads the last N
+games of the teams that played, and each team's latest features live in an indexed
+table for single-row lookups.
+
+Stored per-game features only use the games before that game, so they can be used
+as training features. A team's latest features include its latest game, which makes
+them the features going into its next game.
+"""
+
+import sqlite3 as _sqlite3
+import pandas as _pd
+from . import hp_instrument as _hpi
+
+
+_sides = {'HOME': 'VISITING', 'VISITING': 'HOME'}
+_key_cols = ['TEAM', 'DT', 'GAME_NUM', 'SORT_KEY']
+
+
+def team_game_records(game_log_df):
+    """Split game log rows into one record per team per game.
+
+    Team stat columns lose their HOME_/VISITING_ prefix (HOME_OFF_HITS -> OFF_HITS) and the
+    record gets the opponent, score and a WIN flag.
+
+    Args:
+        game_log_df (pandas.DataFrame): DataFrame with retro_game_log_cols columns.
+
+    Returns:
+        pandas.DataFrame: Team-game records sorted by TEAM, DT, GAME_NUM.
+    """
+
+    dt = _pd.to_numeric(game_log_df['DT']).astype('int64')
+    game_num = _pd.to_numeric(game_log_df['N_GAMES']).fillna(0).astype('int64')
+
+    records = []
+    for side, opp in _sides.items():
+        stat_cols = [c for c in game_log_df.columns if c.startswith((f"{side}_OFF_", f"{side}_PIT_", f"{side}_DEF_"))]
+        rec = game_log_df[stat_cols].rename(columns=lambda c: c[len(side) + 1:]).apply(_pd.to_numeric, errors='coerce')
+        rec.insert(0, 'TEAM', game_log_df[f"{side}_TEAM"].to_numpy())
+        rec.insert(1, 'DT', dt.to_numpy())
+        rec.insert(2, 'GAME_NUM', game_num.to_numpy())
+        rec.insert(3, 'SORT_KEY', (dt * 10 + game_num).to_numpy())
+        rec.insert(4, 'OPP', game_log_df[f"{opp}_TEAM"].to_numpy())
+        rec.insert(5, 'IS_HOME', int(side == 'HOME'))
+        rec.insert(6, 'RUNS', _pd.to_numeric(game_log_df[f"{side}_SCORE"]).to_numpy())
+        rec.insert(7, 'RUNS_ALLOWED', _pd.to_numeric(game_log_df[f"{opp}_SCORE"]).to_numpy())
+        rec.insert(8, 'WIN', (rec['RUNS'] > rec['RUNS_ALLOWED']).astype(int))
+        records.append(rec)
+
+    records = _pd.concat(records, ignore_index=True)
+    return records.sort_values(['TEAM', 'SORT_KEY'], kind='stable').reset_index(drop=True)
+
+
+def rolling_team_features(records, windows=(10,), stat_cols=None, prior_only=False):
+    """Rolling per-team averages over the last N games.
+
+    Args:
+        records (pandas.DataFrame): Output of team_game_records (sorted by TEAM, SORT_KEY).
+        windows (tuple, optional): Window sizes in games. Defaults to (10,).
+        stat_cols (list, optional): Columns to average. Defaults to RUNS, RUNS_ALLOWED, WIN and the OFF_/PIT_/DEF_ columns.
+        prior_only (bool, optional): Average the N games before each game instead of the N games
+            ending with it, so a game's own result never leaks into its features. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: Key columns plus <stat>_L<N> columns, aligned to records' index.
+    """
+
+    stat_cols = default_stat_cols(records) if stat_cols is None else stat_cols
+    grouped = records.groupby('TEAM', sort=False)[stat_cols]
+
+    features = [records[_key_cols]]
+    for n in windows:
+        rolled = grouped.rolling(n, min_periods=1).mean().reset_index(level=0, drop=True)
+        features.append(rolled.rename(columns=lambda c: f"{c}_L{n}"))
+
+    features = _pd.concat(features, axis=1)
+    return _prior_games(features) if prior_only else features
+
+
+def _prior_games(features):
+    # features before each game = features after the team's previous game
+    feature_cols = [c for c in features.columns if c not in _key_cols]
+    prior = features.groupby('TEAM', sort=False)[feature_cols].shift(1)
+    return _pd.concat([features[_key_cols], prior], axis=1)
+
+
+def default_stat_cols(records):
+    return ['RUNS', 'RUNS_ALLOWED', 'WIN'] + [c for c in records.columns if c.startswith(('OFF_', 'PIT_', 'DEF_'))]
+
+
+class TeamFeatureStore:
+    """Incrementally updated rolling team features persisted in a SQLite db.
+
+    Tables:
+        TEAM_GAMES: raw team-game records, unique on (TEAM, SORT_KEY).
+        TEAM_ROLLING_FEATURES: rolling features per team-game over the games before it, unique on (TEAM, SORT_KEY).
+        TEAM_LATEST_FEATURES: one row per team with its features after its latest game.
+
+    A game sent again replaces the stored one if any of its values changed (the latest copy wins,
+    within a batch and against the store), so corrected game logs can be re-published.
+    """
+    games_table = 'TEAM_GAMES'
+    features_table = 'TEAM_ROLLING_FEATURES'
+    latest_table = 'TEAM_LATEST_FEATURES'
+
+    def __init__(self, db_path, windows=(10,), stat_cols=None):
+        self.db_path = db_path
+        self.windows = tuple(windows)
+        self.stat_cols = stat_cols
+        self._latest = None
+
+    @_hpi.instrumented(rows_in='game_log_df')
+    def update(self, game_log_df):
+        """Add game log rows to the store and refresh the rolling features of the teams involved.
+
+        Games already stored with the same values are ignored; games whose values changed replace
+        the stored copy. Teams receiving games older than their latest stored game (or replaced
+        games) are rebuilt from their full history; everyone else only reads their last N games.
+
+        Args:
+            game_log_df (pandas.DataFrame): DataFrame with retro_game_log_cols columns.
+
+        Returns:
+            int: Number of team-game records added or replaced.
+        """
+
+        new = team_game_records(game_log_df).drop_duplicates(['TEAM', 'SORT_KEY'], keep='last')
+        if new.empty:
+            return 0
+        if self.stat_cols is None:
+            self.stat_cols = default_stat_cols(new)
+
+        with _sqlite3.connect(self.db_path) as conn:
+            teams = list(new['TEAM'].unique())
+
+            if self._table_exists(conn, self.games_table):
+                stored = self._query(conn, f"SELECT * FROM {self.games_table} WHERE TEAM IN ({_placeholders(teams)}) AND SORT_KEY >= ?"
+                    , teams + [int(new['SORT_KEY'].min())])
+                new, replaced = _changed_records(new, stored)
+                if new.empty:
+                    return 0
+                conn.executemany(f"DELETE FROM {self.games_table} WHERE TEAM = ? AND SORT_KEY = ?"
+                    , [(team, int(key)) for team, key in replaced])
+
+                teams = list(new['TEAM'].unique())
+                last_keys = self._query(conn, f"SELECT TEAM, MAX(SORT_KEY) AS LAST_KEY FROM {self.games_table} WHERE TEAM IN ({_placeholders(teams)}) GROUP BY TEAM", teams)
+                first_new = new.groupby('TEAM')['SORT_KEY'].min()
+                last_keys = last_keys.set_index('TEAM')['LAST_KEY'].reindex(first_new.index)
+                late_teams = set(first_new.index[first_new < last_keys]) | {team for team, _ in replaced}
+                late_teams = [t for t in teams if t in late_teams]
+                tail_teams = [t for t in teams if t not in late_teams]
+
+                history = [self._tail(conn, tail_teams, max(self.windows))]
+                if late_teams:
+                    history.append(self._query(conn, f"SELECT * FROM {self.games_table} WHERE TEAM IN ({_placeholders(late_teams)})", late_teams))
+                    conn.execute(f"DELETE FROM {self.features_table} WHERE TEAM IN ({_placeholders(late_teams)})", late_teams)
+                history = _pd.concat(history, ignore_index=True)
+            else:
+                late_teams = []
+                history = new.iloc[:0]
+
+            combined = _pd.concat([history.assign(_NEW=False), new.assign(_NEW=True)], ignore_index=True)
+            combined = combined.sort_values(['TEAM', 'SORT_KEY'], kind='stable').reset_index(drop=True)
+
+            features = rolling_team_features(combined, windows=self.windows, stat_cols=self.stat_cols)
+            keep = combined['_NEW'] | combined['TEAM'].isin(late_teams)
+            prior_features = _prior_games(features)[keep.to_numpy()]
+
+            new.to_sql(self.games_table, conn, if_exists='append', index=False)
+            prior_features.to_sql(self.features_table, conn, if_exists='append', index=False)
+
+            latest = features.groupby('TEAM', sort=False).tail(1)
+            if self._table_exists(conn, self.latest_table):
+                conn.execute(f"DELETE FROM {self.latest_table} WHERE TEAM IN ({_placeholders(teams)})", teams)
+            latest.to_sql(self.latest_table, conn, if_exists='append', index=False)
+
+            self._create_indexes(conn)
+            conn.commit()
+
+        if self._latest is not None:
+            self._latest.update(latest.set_index('TEAM').to_dict('index'))
+
+        return len(new)
+
+    def lookup(self, team):
+        """Return a team's features after its latest stored game, i.e. the features going into its next game.
+
+        Args:
+            team (str): Retrosheet team code, e.g. 'NYA'.
+
+        Returns:
+            dict: {feature_name: value}, None if the team isn't in the store.
+        """
+
+        if self._latest is None:
+            self._latest = self.latest().set_index('TEAM').to_dict('index')
+        return self._latest.get(team)
+
+    def latest(self, teams=None):
+        """Latest features for all (or the given) teams.
+
+        Args:
+            teams (list, optional): Team codes to return. Defaults to None (all teams).
+
+        Returns:
+            pandas.DataFrame
+        """
+
+        sql_txt = f"SELECT * FROM {self.latest_table}"
+        params = []
+        if teams is not None:
+            sql_txt += f" WHERE TEAM IN ({_placeholders(teams)})"
+            params = list(teams)
+        with _sqlite3.connect(self.db_path) as conn:
+            if not self._table_exists(conn, self.latest_table):
+                return _pd.DataFrame(columns=_key_cols)
+            return self._query(conn, sql_txt, params)
+
+    def history(self, team=None, start_dt=None):
+        """Rolling features per team-game, each over the games before it (first games are NaN).
+
+        A row never includes its own game's result, so these are safe to use as training features and
+        line up with what lookup returns for a team's next game.
+
+        Args:
+            team (str, optional): Team code. Defaults to None (all teams).
+            start_dt (int, optional): First date to return as yyyymmdd. Defaults to None.
+
+        Returns:
+            pandas.DataFrame
+        """
+
+        where, params = [], []
+        if team is not None:
+            where.append("TEAM = ?")
+            params.append(team)
+        if start_dt is not None:
+            where.append("DT >= ?")
+            params.append(int(start_dt))
+        sql_txt = f"SELECT * FROM {self.features_table}"
+        if where:
+            sql_txt += " WHERE " + " AND ".join(where)
+        sql_txt += " ORDER BY TEAM, SORT_KEY"
+        with _sqlite3.connect(self.db_path) as conn:
+            return self._query(conn, sql_txt, params)
+
+    def _tail(self, conn, teams, n):
+        if not teams or n <= 0:
+            return _pd.DataFrame()
+        sql_txt = f"""
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY TEAM ORDER BY SORT_KEY DESC) AS _RN
+                FROM {self.games_table}
+                WHERE TEAM IN ({_placeholders(teams)})
+            ) WHERE _RN <= ?
+        """
+        return self._query(conn, sql_txt, list(teams) + [n]).drop(columns='_RN')
+
+    def _create_indexes(self, conn):
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS IX_{self.games_table} ON {self.games_table}(TEAM, SORT_KEY)")
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS IX_{self.features_table} ON {self.features_table}(TEAM, SORT_KEY)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS IX_{self.features_table}_DT ON {self.features_table}(DT)")
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS IX_{self.latest_table} ON {self.latest_table}(TEAM)")
+
+    @staticmethod
+    def _table_exists(conn, table_name):
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone() is not None
+
+    @staticmethod
+    def _query(conn, sql_txt, params=()):
+        return _pd.read_sql_query(sql_txt, conn, params=list(params))
+
+
+def _changed_records(new, stored):
+    # drop records stored with the same values, return the rest and the (TEAM, SORT_KEY) keys they replace
+    keys = ['TEAM', 'SORT_KEY']
+    if stored.empty:
+        return new, []
+
+    new_idx = new.set_index(keys)
+    stored_idx = stored.set_index(keys)
+    common = new_idx.index.intersection(stored_idx.index)
+    cols = [c for c in new_idx.columns if c in stored_idx.columns]
+    a = new_idx.loc[common, cols]
+    b = stored_idx.loc[common, cols]
+    same = ((a == b) | (a.isna() & b.isna())).all(axis=1).to_numpy()
+
+    new = new[~new_idx.index.isin(common[same])]
+    return new, list(common[~same])
+
+
+def _placeholders(values):
+    return ','.join('?' for _ in values)
@@ -3,8 +3,9 @@ Functions for fuzzy matching
 """
 
 import pandas as _pd
-from fuzzywuzzy import fuzz as _fuzz, process as _process
+from . import hp_instrument as _hpi
 
+@_hpi.instrumented(rows_in='col1', rows_out=True)
 def fuzzy_match_df(col1, col2, threshold=90, fuzz_type='token_sort_ratio'):
     """Create intermediate pandas DataFrame that fuzzy matches 2 arrays of strings.
 
@@ -18,6 +19,8 @@ def fuzzy_match_df(col1, col2, threshold=90, fuzz_type='token_sort_ratio'):
         pandas.DataFrame: Returns a DataFrame from which you can join matched objects together on.
     """
 
+    from fuzzywuzzy import fuzz as _fuzz, process as _process
+
     # get unique values from columns passed to function
     col1 = _pd.Series(col1).unique()
     col2 = _pd.Series(col2).unique()
@@ -33,4 +36,6 @@ def fuzzy_match_df(col1, col2, threshold=90, fuzz_type='token_sort_ratio'):
             match_tuple = (c1, match[0])
 
         matches.append(match_tuple)
+
+    _hpi.note(n_matched=sum(match is not None for _, match in matches))
     return _pd.DataFrame(matches, columns=['COL1', 'COL2_MATCH'])
\ No newline at end of file
@@ -2,21 +2,63 @@
 This module is used to work with Google Sheets in Google Drive
 """
 
-import gspread as _gspread
-import gspread_dataframe as _gdf
-from google.colab import auth as _auth
-from google.auth import default as _default
+import math as _math
+import numbers as _numbers
+from . import hp_instrument as _hpi
 
 
-def df_to_gsheet(df, gsheet_name='DFSheet'):
-    gc = gc_object()
-    gc.create(gsheet_name) 
-    sheet = gc.open(gsheet_name).sheet1
-    _gdf.set_with_dataframe(sheet, df)
+_gc_cache = {}
+
+
+@_hpi.instrumented(rows_in='df')
+def df_to_gsheet(df, gsheet_name='DFSheet', sheet_name=None, sync=False, include_index=False, chunk_rows=5000, gc=None):
+    """Write a pandas DataFrame to a Google Sheet, creating the spreadsheet/worksheet if needed.
+
+    With sync=True the frame is diffed against the sheet's current (unformatted) contents and only
+    the changed ranges are sent. Otherwise the whole frame is written. Either way values go out RAW
+    as batched updates of at most chunk_rows rows each, so numbers stay numbers and strings are
+    stored exactly as given (leading zeros, timestamps) and compare equal on the next sync.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to write.
+        gsheet_name (str, optional): Spreadsheet name. Defaults to 'DFSheet'.
+        sheet_name (str, optional): Worksheet name. Defaults to None (first sheet).
+        sync (bool, optional): Only send cells that differ from the sheet. Defaults to False.
+        include_index (bool, optional): Write the index as leading column(s). Defaults to False.
+        chunk_rows (int, optional): Max rows per batch update request. Defaults to 5000.
+        gc (gspread.Client, optional): Client to use. Defaults to the cached gc_object().
+
+    Returns:
+        int: Number of cells sent.
+    """
+
+    gc = gc_object() if gc is None else gc
+    sheet = _worksheet(_open_or_create(gc, gsheet_name), sheet_name)
 
+    new_values = df_to_values(df, include_index=include_index)
+    old_values = [[_cell_value(v) for v in row] for row in sheet.get_all_values(value_render_option='UNFORMATTED_VALUE')] if sync else []
 
+    n_rows = max(len(new_values), len(old_values))
+    n_cols = max(max((len(row) for row in new_values), default=0), max((len(row) for row in old_values), default=0))
+    if n_rows == 0 or n_cols == 0:
+        return 0
 
+    if sheet.row_count < n_rows or sheet.col_count < n_cols:
+        sheet.resize(rows=max(sheet.row_count, n_rows), cols=max(sheet.col_count, n_cols))
+
+    if sync:
+        updates = diff_ranges(old_values, new_values)
+    else:
+        sheet.clear()
+        updates = [(0, 0, new_values)]
+
+    return _batch_update(sheet, updates, chunk_rows)
+
+
+@_hpi.instrumented(rows_out=True)
 def gsheet_to_df(df, gsheet_name, sheet_name=None):
+    import gspread_dataframe as _gdf
+
     gc = gc_object()
     try:
         sheet = gc.open(gsheet_name).worksheet(sheet_name)
@@ -28,11 +70,155 @@ def gsheet_to_df(df, gsheet_name, sheet_name=None):
     return df
 
 
+def gc_object(refresh=False):
+    """Return an authorized gspread client, authenticating only on the first call.
+
+    Args:
+        refresh (bool, optional): Re-authenticate and replace the cached client. Defaults to False.
+
+    Returns:
+        gspread.Client
+    """
+
+    if refresh or 'gc' not in _gc_cache:
+        # google.colab only exists inside Colab, so auth imports wait until a client is needed
+        import gspread as _gspread
+        from google.colab import auth as _auth
+        from google.auth import default as _default
+
+        _auth.authenticate_user()
+        creds, _ = _default()
+
+        _gc_cache['gc'] = _gspread.authorize(creds)
+
+    return _gc_cache['gc']
+
+
+def df_to_values(df, include_index=False):
+    """Convert a DataFrame to a list of rows (header first) of the values the sheet will store.
+
+    Missing values become '', numbers become int (if integral) or float, bools stay bools and
+    everything else is converted with str(). Sheet values read back with UNFORMATTED_VALUE
+    normalise to the same form.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to convert.
+        include_index (bool, optional): Include the index as leading column(s). Defaults to False.
+
+    Returns:
+        list: List of lists of cell values.
+    """
+
+    if include_index:
+        df = df.reset_index()
+
+    header = [_cell_value(col) for col in df.columns]
+    return [header] + [[_cell_value(v) for v in row] for row in df.itertuples(index=False, name=None)]
 
-def gc_object():
-    _auth.authenticate_user()
-    creds, _ = _default()
 
-    gc = _gspread.authorize(creds)
+def diff_ranges(old_values, new_values):
+    """Find the blocks of cells that differ between 2 grids of cell values.
 
-    return gc
\ No newline at end of file
+    Each row's changed cells are reduced to one column span, and consecutive rows with the same
+    span are merged into a single block. Cells that only exist in old_values are blanked out.
+
+    Args:
+        old_values (list): Current sheet values as a list of rows.
+        new_values (list): Values to write as a list of rows (see df_to_values).
+
+    Returns:
+        list: List of (row_offset, col_offset, values) blocks, 0-based.
+    """
+
+    n_rows = max(len(new_values), len(old_values))
+    n_cols = max(max((len(row) for row in new_values), default=0), max((len(row) for row in old_values), default=0))
+
+    def _padded(values, i):
+        row = values[i] if i < len(values) else []
+        return list(row) + [''] * (n_cols - len(row))
+
+    blocks = []
+    for i in range(n_rows):
+        old_row, new_row = _padded(old_values, i), _padded(new_values, i)
+        changed = [j for j in range(n_cols) if old_row[j] != new_row[j] or type(old_row[j]) is not type(new_row[j])]
+        if not changed:
+            continue
+
+        first, last = changed[0], changed[-1]
+        span = new_row[first:last + 1]
+        prev = blocks[-1] if blocks else None
+        if prev is not None and prev[1] == first and len(prev[2][0]) == len(span) and prev[0] + len(prev[2]) == i:
+            prev[2].append(span)
+        else:
+            blocks.append((i, first, [span]))
+
+    return blocks
+
+
+def _batch_update(sheet, blocks, chunk_rows):
+    from gspread.utils import rowcol_to_a1 as _rowcol_to_a1
+
+    # split tall blocks so no request carries more than chunk_rows rows
+    pieces = []
+    for row_offset, col_offset, values in blocks:
+        for start in range(0, len(values), chunk_rows):
+            pieces.append((row_offset + start, col_offset, values[start:start + chunk_rows]))
+
+    batch, batch_rows, n_cells = [], 0, 0
+    for row_offset, col_offset, values in pieces:
+        if batch and batch_rows + len(values) > chunk_rows:
+            sheet.batch_update(batch, value_input_option='RAW')
+            batch, batch_rows = [], 0
+
+        n_cols = max(len(row) for row in values)
+        cell_range = f"{_rowcol_to_a1(row_offset + 1, col_offset + 1)}:{_rowcol_to_a1(row_offset + len(values), col_offset + n_cols)}"
+        batch.append({'range': cell_range, 'values': values})
+        batch_rows += len(values)
+        n_cells += sum(len(row) for row in values)
+
+    if batch:
+        sheet.batch_update(batch, value_input_option='RAW')
+
+    return n_cells
+
+
+def _cell_value(v):
+    if v is None:
+        return ''
+    if isinstance(v, bool) or getattr(getattr(v, 'dtype', None), 'kind', None) == 'b':
+        return bool(v)
+    if isinstance(v, _numbers.Integral):
+        return int(v)
+    if isinstance(v, _numbers.Real):
+        v = float(v)
+        if _math.isnan(v) or _math.isinf(v):
+            return ''
+        return int(v) if v.is_integer() else v
+    try:
+        if v != v:  # pandas.NA/NaT style missing values
+            return ''
+    except TypeError:
+        return ''
+    except ValueError:
+        pass
+    return str(v)
+
+
+def _open_or_create(gc, gsheet_name):
+    from gspread.exceptions import SpreadsheetNotFound as _SpreadsheetNotFound
+
+    try:
+        return gc.open(gsheet_name)
+    except _SpreadsheetNotFound:
+        return gc.create(gsheet_name)
+
+
+def _worksheet(spreadsheet, sheet_name=None):
+    from gspread.exceptions import WorksheetNotFound as _WorksheetNotFound
+
+    if sheet_name is None:
+        return spreadsheet.sheet1
+    try:
+        return spreadsheet.worksheet(sheet_name)
+    except _WorksheetNotFound:
+        return spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=26)
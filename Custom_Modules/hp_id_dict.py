@@ -0,0 +1,244 @@
+"""
+This module is used to store Retrosheet IDs as compact integer codes.
+
+Game logs carry dozens of *_ID/*_NAME string pairs (batters, pitchers, umpires,
+managers, park). RetroIdDict maps every ID to a dense int32 code shared by all
+columns, keeps the names in a lookup table persisted to SQLite, and turns codes
+back into IDs/names when a frame is output.
+
+Only columns known to hold codes are decoded: encode lists them in the frame's
+attrs, and the SQLite helpers persist them per table next to the dictionary, so
+numeric ID columns from other sources are never mistaken for codes.
+"""
+
+import sqlite3 as _sqlite3
+import numpy as _np
+import pandas as _pd
+
+
+_missing_ids = {'', '(none)'}
+_cols_table = 'RETRO_ID_COLS'
+
+
+def id_cols(df):
+    """Return the Retrosheet ID columns (*_ID) of a DataFrame.
+    """
+    return [c for c in df.columns if str(c).endswith('_ID')]
+
+
+def encoded_cols(df):
+    """Return the columns of a DataFrame that RetroIdDict.encode replaced with codes.
+    """
+    return [c for c in df.attrs.get('retro_id_cols', []) if c in df.columns]
+
+
+def table_id_cols(db_path, table_name=None):
+    """Return the code columns saved for a SQLite table.
+
+    Args:
+        db_path (string): path/to/sqlite.db
+        table_name (string, optional): Table name. Defaults to None (code columns of every table).
+
+    Returns:
+        list
+    """
+
+    sql_txt = f"SELECT DISTINCT COL_NAME FROM {_cols_table}"
+    params = []
+    if table_name is not None:
+        sql_txt += " WHERE TABLE_NAME = ?"
+        params.append(table_name)
+    with _sqlite3.connect(db_path) as conn:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (_cols_table,)).fetchone() is None:
+            return []
+        cols = [col for col, in conn.execute(sql_txt, params).fetchall()]
+    conn.close()
+    return cols
+
+
+def save_table_id_cols(db_path, table_name, cols, append=False):
+    """Save which columns of a SQLite table hold codes.
+
+    Args:
+        db_path (string): path/to/sqlite.db
+        table_name (string): Table name.
+        cols (list): Code columns.
+        append (bool, optional): Add to the columns already saved instead of replacing them. Defaults to False.
+    """
+
+    with _sqlite3.connect(db_path) as conn:
+        if not cols and conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (_cols_table,)).fetchone() is None:
+            return  # nothing to record and nothing stale to clear
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {_cols_table}(TABLE_NAME TEXT NOT NULL, COL_NAME TEXT NOT NULL, PRIMARY KEY (TABLE_NAME, COL_NAME))")
+        if not append:
+            conn.execute(f"DELETE FROM {_cols_table} WHERE TABLE_NAME = ?", (table_name,))
+        conn.executemany(f"INSERT OR IGNORE INTO {_cols_table} (TABLE_NAME, COL_NAME) VALUES (?, ?)"
+            , [(table_name, col) for col in cols])
+        conn.commit()
+    conn.close()
+
+
+class RetroIdDict:
+    """Shared Retrosheet ID <-> int32 code dictionary, optionally persisted in a SQLite db.
+
+    Missing IDs encode to -1. Load the dictionary from the db before encoding and save it
+    after, so every table written to that db uses the same codes.
+    """
+    table_name = 'RETRO_ID_DICT'
+
+    def __init__(self, db_path=None):
+        self.codes = {}
+        self.ids = []
+        self.names = []
+        self._renamed = set()
+        if db_path is not None:
+            self.load(db_path)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def encode_ids(self, values, names=None):
+        """Map IDs to codes, adding unseen IDs to the dictionary.
+
+        Args:
+            values (array-like): Retrosheet IDs.
+            names (array-like, optional): Names aligned with values, stored for new or unnamed IDs (the first
+                name seen for an ID is kept). Defaults to None.
+
+        Returns:
+            numpy.ndarray: int32 codes, -1 where the ID is missing.
+        """
+
+        values = _pd.Series(values, dtype=object).where(lambda s: ~s.isin(_missing_ids))
+        if names is not None:
+            names = _pd.Series(names, dtype=object).where(lambda s: ~s.isin(_missing_ids))
+            pairs = _pd.DataFrame({'ID': values.to_numpy(), 'NAME': names.to_numpy()}).dropna(subset=['ID'])
+            pairs = pairs.drop_duplicates('ID')
+        else:
+            pairs = _pd.DataFrame({'ID': values.dropna().unique(), 'NAME': None})
+
+        for retro_id, name in pairs.itertuples(index=False, name=None):
+            code = self.codes.get(retro_id)
+            if code is None:
+                self.codes[retro_id] = len(self.ids)
+                self.ids.append(retro_id)
+                self.names.append(None if _pd.isna(name) else name)
+            elif self.names[code] is None and not _pd.isna(name):
+                self.names[code] = name
+                self._renamed.add(code)
+
+        return values.map(self.codes).fillna(-1).astype('int32').to_numpy()
+
+    def encode(self, df, drop_names=True):
+        """Replace each text *_ID column with int32 codes.
+
+        Numeric *_ID columns aren't Retrosheet IDs and are left alone. The encoded columns are
+        listed in the returned frame's attrs (see encoded_cols), which is what decode goes by.
+
+        Args:
+            df (pandas.DataFrame): DataFrame with Retrosheet *_ID (and optional *_NAME) columns.
+            drop_names (bool, optional): Drop the *_NAME columns paired with the ID columns. Defaults to True.
+
+        Returns:
+            pandas.DataFrame: Copy of df with encoded ID columns.
+        """
+
+        df = df.copy()
+        code_cols = encoded_cols(df)
+        name_cols = []
+        for col in id_cols(df):
+            name_col = f"{col[:-3]}_NAME"
+            names = df[name_col] if name_col in df.columns else None
+            if col not in code_cols and _pd.api.types.is_numeric_dtype(df[col]):
+                continue  # not a Retrosheet ID
+            if names is not None:
+                name_cols.append(name_col)
+            if col in code_cols:
+                continue  # already encoded
+            df[col] = self.encode_ids(df[col], names)
+            code_cols.append(col)
+
+        if drop_names:
+            df = df.drop(columns=name_cols)
+        df.attrs['retro_id_cols'] = code_cols
+        return df
+
+    def decode(self, df, names=True, cols=None):
+        """Replace encoded *_ID columns with the Retrosheet ID strings.
+
+        Args:
+            df (pandas.DataFrame): DataFrame from encode (or read back from SQLite).
+            names (bool, optional): Add a *_NAME column after each ID column that has known names. Defaults to True.
+            cols (list, optional): Code columns to decode. Defaults to None (encoded_cols(df)).
+
+        Raises:
+            ValueError: A column holds codes this dictionary doesn't have.
+
+        Returns:
+            pandas.DataFrame
+        """
+
+        cols = encoded_cols(df) if cols is None else [c for c in cols if c in df.columns]
+        df = df.copy()
+        ids = _np.array(self.ids + [None], dtype=object)  # code -1 indexes the trailing None
+        id_names = _np.array(self.names + [None], dtype=object)
+
+        for col in cols:
+            if not _pd.api.types.is_integer_dtype(df[col]):
+                continue
+            codes = df[col].to_numpy()
+            if codes.size and (codes.min() < -1 or codes.max() >= len(self.ids)):
+                raise ValueError(f"{col} has codes outside -1..{len(self.ids) - 1}; decode with the dictionary saved in the db the codes came from!")
+            df[col] = ids[codes]
+
+            name_col = f"{col[:-3]}_NAME"
+            col_names = id_names[codes]
+            if names and name_col not in df.columns and _pd.notna(col_names).any():
+                df.insert(df.columns.get_loc(col) + 1, name_col, col_names)
+
+        df.attrs['retro_id_cols'] = [c for c in encoded_cols(df) if c not in cols]
+        return df
+
+    def load(self, db_path):
+        """Load the dictionary saved in a SQLite db (no-op if it hasn't been saved there yet).
+
+        Args:
+            db_path (string): path/to/sqlite.db
+        """
+
+        with _sqlite3.connect(db_path) as conn:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (self.table_name,)).fetchone() is None:
+                return
+            rows = conn.execute(f"SELECT CODE, RETRO_ID, NAME FROM {self.table_name} ORDER BY CODE").fetchall()
+        conn.close()
+
+        self.ids = [retro_id for _, retro_id, _ in rows]
+        self.names = [name for _, _, name in rows]
+        self.codes = {retro_id: code for code, retro_id, _ in rows}
+        self._renamed = set()
+
+    def save(self, db_path):
+        """Write new IDs and names to a SQLite db.
+
+        Args:
+            db_path (string): path/to/sqlite.db
+
+        Raises:
+            ValueError: The db has codes for other IDs than this dictionary, so the 2 would disagree.
+        """
+
+        with _sqlite3.connect(db_path) as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name}(CODE INTEGER PRIMARY KEY, RETRO_ID TEXT NOT NULL UNIQUE, NAME TEXT)")
+            stored_ids = [retro_id for retro_id, in conn.execute(f"SELECT RETRO_ID FROM {self.table_name} ORDER BY CODE").fetchall()]
+            n_stored = len(stored_ids)
+            if stored_ids != self.ids[:n_stored]:
+                raise ValueError(f"{self.table_name} in {db_path} has different codes than this dictionary; load the dictionary from this db before encoding!")
+
+            new_rows = [(code, self.ids[code], self.names[code]) for code in range(n_stored, len(self.ids))]
+            conn.executemany(f"INSERT INTO {self.table_name} (CODE, RETRO_ID, NAME) VALUES (?, ?, ?)", new_rows)
+            conn.executemany(f"UPDATE {self.table_name} SET NAME = ? WHERE CODE = ?"
+                , [(self.names[code], code) for code in self._renamed if code < n_stored])
+            conn.commit()
+        conn.close()
+
+        self._renamed = set()
@@ -0,0 +1,263 @@
+"""
+This module is used to time and profile the custom modules.
+
+Instrumentation is off by default. Once enabled, every decorated entry point
+emits one record per call (wall time, rows in/out, bytes transferred and
+optionally peak memory) to each registered sink. Sinks are plain callables
+that take the record dictionary, so anything can be plugged in.
+
+    from hakuna_patata_modules import hp_instrument
+    sink = hp_instrument.MemorySink()
+    hp_instrument.enable(sink, trace_memory=True)
+    ...
+    sink.to_df()
+"""
+
+import json as _json
+import time as _time
+import logging as _logging
+import datetime as _datetime
+import functools as _functools
+import inspect as _inspect
+import threading as _threading
+import tracemalloc as _tracemalloc
+from contextlib import contextmanager as _contextmanager
+
+
+_logger = _logging.getLogger('hakuna_patata')
+_state = {'sinks': (), 'trace_memory': False}
+_local = _threading.local()
+
+# tracemalloc is process-wide, so traced calls in different threads share it
+_trace_lock = _threading.Lock()
+_trace = {'active': 0, 'started': False, 'overlaps': 0}
+
+
+class MemorySink:
+    """Sink that keeps records in a list.
+    """
+    def __init__(self):
+        self.records = []
+        self._lock = _threading.Lock()
+
+    def __call__(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+
+    def to_df(self):
+        """Return the collected records as a pandas DataFrame.
+        """
+        import pandas as _pd
+        return _pd.DataFrame(self.records)
+
+
+class LoggingSink:
+    """Sink that writes each record to a logging.Logger.
+    """
+    def __init__(self, logger=None, level=_logging.INFO):
+        self.logger = _logger if logger is None else logger
+        self.level = level
+
+    def __call__(self, record):
+        self.logger.log(self.level, "%s %.4fs rows_in=%s rows_out=%s bytes=%s peak_mem=%s"
+            , record['name'], record['wall_sec'], record['rows_in'], record['rows_out']
+            , record['bytes'], record['peak_mem_bytes'])
+
+
+class JSONLinesSink:
+    """Sink that appends each record as one JSON line to a file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = _threading.Lock()
+
+    def __call__(self, record):
+        line = _json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+def enable(*sinks, trace_memory=False):
+    """Turn instrumentation on.
+
+    Args:
+        *sinks (callable): Callables that receive each record dictionary.
+        trace_memory (bool, optional): Record peak memory with tracemalloc (slows calls down). Calls that
+            overlap another traced call in a different thread record None. Defaults to False.
+    """
+
+    if not sinks:
+        raise ValueError("enable needs at least one sink!")
+    _state['sinks'] = tuple(sinks)
+    _state['trace_memory'] = trace_memory
+
+
+def disable():
+    """Turn instrumentation off.
+    """
+
+    _state['sinks'] = ()
+    _state['trace_memory'] = False
+
+
+def is_enabled():
+    return bool(_state['sinks'])
+
+
+@_contextmanager
+def instrumentation(*sinks, trace_memory=False):
+    """Context manager that enables instrumentation and restores the previous settings on exit.
+
+    Args:
+        *sinks (callable): Callables that receive each record dictionary.
+        trace_memory (bool, optional): Record peak memory with tracemalloc. Defaults to False.
+    """
+
+    prev_state = dict(_state)
+    enable(*sinks, trace_memory=trace_memory)
+    try:
+        yield
+    finally:
+        _state.update(prev_state)
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def add_bytes(nbytes):
+    """Add to the bytes transferred by the entry point currently running. No-op when disabled.
+
+    Args:
+        nbytes (int): Number of bytes.
+    """
+
+    stack = _stack()
+    if stack:
+        record = stack[-1]
+        record['bytes'] = (record['bytes'] or 0) + int(nbytes)
+
+
+def note(**fields):
+    """Set extra fields on the record of the entry point currently running. No-op when disabled.
+    """
+
+    stack = _stack()
+    if stack:
+        stack[-1].update(fields)
+
+
+def _start_trace():
+    # returns a token for _stop_trace; the first traced call resets the peak, later ones leave it alone
+    with _trace_lock:
+        overlapped = _trace['active'] > 0
+        if overlapped:
+            _trace['overlaps'] += 1
+        else:
+            if not _tracemalloc.is_tracing():
+                _tracemalloc.start()
+                _trace['started'] = True
+            _tracemalloc.reset_peak()
+        _trace['active'] += 1
+        return (overlapped, _trace['overlaps'])
+
+
+def _stop_trace(token):
+    # peak memory of the call, None if another traced call ran at the same time
+    overlapped, overlaps = token
+    with _trace_lock:
+        peak = None
+        if not overlapped and overlaps == _trace['overlaps'] and _tracemalloc.is_tracing():
+            peak = _tracemalloc.get_traced_memory()[1]
+        _trace['active'] -= 1
+        if _trace['active'] == 0 and _trace['started']:
+            _tracemalloc.stop()
+            _trace['started'] = False
+        return peak
+
+
+def _nrows(obj):
+    try:
+        return int(obj.shape[0])
+    except (AttributeError, IndexError, TypeError):
+        pass
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+def instrumented(name=None, rows_in=None, rows_out=False):
+    """Decorator that records calls to an entry point while instrumentation is enabled.
+
+    Args:
+        name (str, optional): Record name. Defaults to module.qualname of the function.
+        rows_in (str, optional): Name of the argument whose length is rows in. Defaults to None.
+        rows_out (bool or callable, optional): True for the length of the return value or a
+            callable taking the return value. Defaults to False.
+    """
+
+    def decorator(func):
+        record_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+        signature = _inspect.signature(func) if rows_in is not None else None
+
+        @_functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sinks = _state['sinks']
+            if not sinks:
+                return func(*args, **kwargs)
+
+            record = {
+                'name': record_name
+                , 'start': _datetime.datetime.now().isoformat()
+                , 'wall_sec': None
+                , 'rows_in': None
+                , 'rows_out': None
+                , 'bytes': None
+                , 'peak_mem_bytes': None
+                , 'error': None
+            }
+            if signature is not None:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                if rows_in in bound:
+                    record['rows_in'] = _nrows(bound[rows_in])
+
+            stack = _stack()
+            trace_memory = _state['trace_memory'] and not stack  # only the outermost call in a thread is traced
+            trace_token = _start_trace() if trace_memory else None
+
+            stack.append(record)
+            start = _time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                record['error'] = type(e).__name__
+                raise
+            else:
+                if rows_out is True:
+                    record['rows_out'] = _nrows(result)
+                elif callable(rows_out):
+                    record['rows_out'] = rows_out(result)
+                return result
+            finally:
+                record['wall_sec'] = _time.perf_counter() - start
+                stack.pop()
+                if trace_memory:
+                    record['peak_mem_bytes'] = _stop_trace(trace_token)
+                for sink in sinks:
+                    try:
+                        sink(record)
+                    except Exception:
+                        # a broken sink must never change what the instrumented call does
+                        _logger.warning("instrumentation sink %r failed for %s", sink, record_name, exc_info=True)
+
+        return wrapper
+
+    return decorator
@@ -1,4 +1,8 @@
 import os as _os
+import hashlib as _hashlib
+from zipfile import ZipFile as _ZF
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from . import hp_instrument as _hpi
 
 def kaggle_api(username, api_key):
     """Creates a Kaggle API object which can download and search for datasets.
@@ -21,24 +25,155 @@ def kaggle_api(username, api_key):
 
 
 
-def kaggle_dataset_download(kaggle_api, dataset, file_list, download_path, force=True, quiet=True):
+def _local_file(download_path, file_name):
+    # Kaggle saves compressed files as <file_name>.zip
+    for name in (file_name, f"{file_name}.zip"):
+        file_path = _os.path.join(download_path, _os.path.basename(name))
+        if _os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def _file_md5(file_path, chunksize=1048576):
+    md5 = _hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunksize), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _remote_sizes(kaggle_api, dataset=None, comp_name=None):
+    """Map file name -> size in bytes as reported by Kaggle. Empty if the listing fails.
+    """
+    try:
+        if dataset is not None:
+            files = kaggle_api.dataset_list_files(dataset)
+        else:
+            files = kaggle_api.competition_list_files(comp_name)
+    except Exception:
+        return {}
+
+    sizes = {}
+    for f in getattr(files, 'files', files) or []:
+        name = getattr(f, 'name', None)
+        size = getattr(f, 'totalBytes', None)
+        if name is not None and isinstance(size, int):
+            sizes[name] = size
+    return sizes
+
+
+def _file_is_current(file_path, remote_size=None, md5=None):
+    if file_path is None:
+        return False
+    if md5 is not None:
+        return _file_md5(file_path) == md5
+    if remote_size is not None and not file_path.endswith('.zip'):
+        return _os.path.getsize(file_path) == remote_size
+    return False
+
+
+def _unzip(file_path, download_path):
+    with _ZF(file_path) as zf:
+        zf.extractall(download_path)
+
+
+def kaggle_parallel_download(kaggle_api, file_list, download_path, dataset=None, comp_name=None, max_workers=4, checksums=None, unzip=False, force=False, quiet=True):
+    """Download dataset or competition files concurrently, skipping files that are already up to date.
+
+    A local file is skipped when its md5 matches `checksums` or, without a checksum, when its size
+    matches the size Kaggle lists for it. Everything else goes to the Kaggle client with force=False,
+    which resumes partial files and skips files with a newer local copy.
+
+    Args:
+        kaggle_api (KaggleApi): Authenticated Kaggle API object (see kaggle_api).
+        file_list (iterable): File names to download.
+        download_path (str): path/to/download/dir
+        dataset (str, optional): Dataset in [owner]/[dataset-name] format. Defaults to None.
+        comp_name (str, optional): Competition name, used when dataset is None. Defaults to None.
+        max_workers (int, optional): Max concurrent downloads/unzips. Defaults to 4.
+        checksums (dict, optional): {file_name: md5 hex digest} to verify downloads against. Defaults to None.
+        unzip (bool, optional): Extract newly downloaded .zip files into download_path. Defaults to False.
+        force (bool, optional): Re-download every file from scratch. Defaults to False.
+        quiet (bool, optional): Suppress Kaggle client progress output. Defaults to True.
+
+    Returns:
+        dict: {file_name: 'skipped' | 'downloaded' | 'failed'}
+    """
+
+    if (dataset is None) == (comp_name is None):
+        raise ValueError("Pass exactly one of dataset or comp_name!")
+
+    file_list = list(file_list)
+    checksums = {} if checksums is None else checksums
+    if not _os.path.exists(download_path):
+        _os.makedirs(download_path)
+
+    remote_sizes = {} if force else _remote_sizes(kaggle_api, dataset=dataset, comp_name=comp_name)
+
+    def _download(file_, force_):
+        if dataset is not None:
+            return kaggle_api.dataset_download_file(dataset=dataset, file_name=file_, path=download_path, force=force_, quiet=quiet)
+        else:
+            return kaggle_api.competition_download_file(competition=comp_name, file_name=file_, path=download_path, force=force_, quiet=quiet)
+
+    errors = {}
+
+    def _fetch(file_):
+        try:
+            return _fetch_one(file_)
+        except Exception as e:
+            errors[file_] = f"failed to download ({type(e).__name__}: {e})"
+            return 'failed'
+
+    def _fetch_one(file_):
+        if not force and _file_is_current(_local_file(download_path, file_), remote_sizes.get(file_), checksums.get(file_)):
+            return 'skipped'
+
+        downloaded = _download(file_, force)
+        if file_ in checksums and not _file_is_current(_local_file(download_path, file_), md5=checksums[file_]):
+            _download(file_, True)  # corrupt or stale partial file, start over
+            if not _file_is_current(_local_file(download_path, file_), md5=checksums[file_]):
+                errors[file_] = "failed checksum verification"
+                return 'failed'
+            downloaded = True
+        return 'skipped' if downloaded is False else 'downloaded'
+
+    with _ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(file_list, pool.map(_fetch, file_list)))
+
+        for file_, status in results.items():
+            if status == 'downloaded':
+                file_path = _local_file(download_path, file_)
+                if _hpi.is_enabled() and file_path is not None:
+                    _hpi.add_bytes(_os.path.getsize(file_path))
+                print(f"{file_} successfully downloaded to {download_path}")
+            elif status == 'skipped':
+                print(f"{file_} already up to date in {download_path}")
+            else:
+                print(f"ERROR: {file_} {errors[file_]}!")
+
+        if unzip:
+            zip_paths = [_local_file(download_path, file_) for file_, status in results.items() if status == 'downloaded']
+            zip_paths = [file_path for file_path in zip_paths if file_path is not None and file_path.endswith('.zip')]
+            list(pool.map(lambda file_path: _unzip(file_path, download_path), zip_paths))
+
+    return results
+
+
+@_hpi.instrumented(rows_in='file_list')
+def kaggle_dataset_download(kaggle_api, dataset, file_list, download_path, force=False, quiet=True, max_workers=4, checksums=None, unzip=False):
     if not isinstance(file_list.__iter__(), object):
         print(f"Argument Error: file_list must be iterable object!")
     else:
-        if not _os.path.exists(download_path):
-            _os.makedirs(download_path)
-        for file_ in file_list:
-            kaggle_api.dataset_download_file(dataset=dataset, file_name=file_, path=download_path, force=force, quiet=quiet)
-            print(f"{file_} successfully downloaded to {download_path}")
+        return kaggle_parallel_download(kaggle_api, file_list, download_path, dataset=dataset, max_workers=max_workers
+            , checksums=checksums, unzip=unzip, force=force, quiet=quiet)
 
 
 
-def kaggle_comp_download(kaggle_api, comp_name, file_list, download_path, force=True, quiet=True):
+@_hpi.instrumented(rows_in='file_list')
+def kaggle_comp_download(kaggle_api, comp_name, file_list, download_path, force=False, quiet=True, max_workers=4, checksums=None, unzip=False):
     if not isinstance(file_list.__iter__(), object):
         print(f"Argument Error: file_list must be iterable object!")
     else:
-        if not _os.path.exists(download_path):
-            _os.makedirs(download_path)
-        for file_ in file_list:
-            kaggle_api.competition_download_file(competition=comp_name, file_name=file_, path=download_path, force=force, quiet=quiet)
-            print(f"{file_} successfully downloaded to {download_path}")
\ No newline at end of file
+        return kaggle_parallel_download(kaggle_api, file_list, download_path, comp_name=comp_name, max_workers=max_workers
+            , checksums=checksums, unzip=unzip, force=force, quiet=quiet)
\ No newline at end of file
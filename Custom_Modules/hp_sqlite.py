@@ -5,14 +5,19 @@ This module is used to work with SQLite .db
 
 import sqlite3 as _sqlite3
 import pandas as _pd
-import dask.dataframe as _dd 
+from . import hp_instrument as _hpi
+from . import hp_id_dict as _hpid
 
-def sql_to_df(db_path, sql_txt):
+@_hpi.instrumented(rows_out=True)
+def sql_to_df(db_path, sql_txt, id_dict=None, id_table=None):
     """Query SQLite database/table and return results into pandas DataFrame
 
     Args:
         db_path (string): SQLite DB path.
         sql_txt (string): SQL statement in string format.
+        id_dict (hp_id_dict.RetroIdDict, optional): Decode the code columns written by df_to_sqlite back to IDs/names. Defaults to None.
+        id_table (string, optional): Table the code columns come from. Defaults to None (code columns of any
+            table written with an id_dict, pass it when another table has a numeric column with the same name).
 
     Returns:
         pandas.DataFrame
@@ -20,11 +25,15 @@ def sql_to_df(db_path, sql_txt):
 
     with _sqlite3.connect(db_path) as conn:
         df = _pd.read_sql_query(sql_txt, conn)
-        return df
     conn.close()
 
+    if id_dict is not None:
+        df = id_dict.decode(df, cols=_hpid.table_id_cols(db_path, id_table))
+    return df
+
 
-def df_to_sqlite(df, db_path, table_name, index=False, if_exists='replace', chunksize=5000):
+@_hpi.instrumented(rows_in='df')
+def df_to_sqlite(df, db_path, table_name, index=False, if_exists='replace', chunksize=5000, id_dict=None):
     """Create SQLite table from pandas DataFrame
 
     Args:
@@ -34,11 +43,20 @@ def df_to_sqlite(df, db_path, table_name, index=False, if_exists='replace', chun
         index (bool, optional): Index created as column?. Defaults to False.
         if_exists (str, optional): Handle method if exists. Defaults to 'replace'.
         chunksize (int, optional): Chunksize for reading into table. Defaults to 5000.
+        id_dict (hp_id_dict.RetroIdDict, optional): Store *_ID columns as integer codes (dropping the
+            paired *_NAME columns) and save the dictionary and the code columns to the same db. Defaults to None.
     """
 
+    if id_dict is not None:
+        df = id_dict.encode(df)
+        id_dict.save(db_path)
+
     df.to_sql(name=table_name, con=f"sqlite:///{db_path}",
               index=index, if_exists=if_exists, chunksize=chunksize)
 
+    if id_dict is not None or if_exists == 'replace':
+        _hpid.save_table_id_cols(db_path, table_name, _hpid.encoded_cols(df), append=(if_exists == 'append'))
+
 
 def sqlite_tables(db_path):
     """Show all custom tables in specified SQLite .db.
@@ -1,40 +1,34 @@
 """
 This module is used to combine SKlearn with Pandas
+
+Importing this module is not lazy: the transformers subclass sklearn.base
+classes, and sklearn.base loads most of sklearn on its own. Only the
+estimators used inside individual transformers (FunctionTransformer,
+OneHotEncoder) are imported when those transformers are created.
 """
 
 from functools import reduce as _reduce
 import pandas as _pd
 from pandas import DataFrame as _DF
-import numpy as _np
-from itertools import chain as _chain
-from joblib import Parallel as _Parallel, delayed as _delayed
-from sklearn.compose import ColumnTransformer as _ColumnTransformer
-from sklearn.preprocessing import (
-    FunctionTransformer as _FunctionTransformer
-    , OneHotEncoder as _OneHotEncoder
-)
 from sklearn.base import (
     TransformerMixin as _TransformerMixin
     , BaseEstimator as _BaseEstimator
 )
-from sklearn.pipeline import (
-    FeatureUnion as _FeatureUnion
-    , _fit_transform_one
-    , _transform_one
-)
-from scipy import sparse as _sparse
-from typing import List as _List, Any as _Any
+from . import hp_instrument as _hpi
 
 
 class DFFunctionTransformer(_TransformerMixin, _BaseEstimator):
     """Class for applying any sklearn transformer as step in pipeline.
     """
     def __init__(self, *args, **kwargs):
+        from sklearn.preprocessing import FunctionTransformer as _FunctionTransformer
         self.FT = _FunctionTransformer(*args, **kwargs)
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         X_xfrm = self.FT.transform(X) 
         X_xfrm = _DF(X_xfrm, index=X.index, columns=X.columns)
@@ -47,11 +41,13 @@ class DFFeatureUnion(_TransformerMixin, _BaseEstimator):
     def __init__(self, transformer_list):
         self.transformer_list = transformer_list
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         for (name, t) in self.transformer_list:
             t.fit(X, y)
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         # assumes X is a DataFrame
         Xts = [t.transform(X) for _, t in self.transformer_list]
@@ -64,9 +60,11 @@ class DFColumnExtractor(_TransformerMixin, _BaseEstimator):
     def __init__(self, cols):
         self.cols = cols
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         Xcols = X[self.cols]
         return Xcols
@@ -78,9 +76,11 @@ class DFColumnDropper(_TransformerMixin, _BaseEstimator):
     def __init__(self, cols):
         self.cols = cols
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         return X.drop(self.cols, axis=1)
 
@@ -89,13 +89,16 @@ class DFDummyTransformer(_TransformerMixin, _BaseEstimator):
     """Class for One-Hot Encoding step in sklearn pipeline.
     """
     def __init__(self, **kwargs):
+        from sklearn.preprocessing import OneHotEncoder as _OneHotEncoder
         self.ohe = _OneHotEncoder(handle_unknown='ignore', sparse=False, **kwargs)
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         self.ohe.fit(X)
         self.cols = self.ohe.get_feature_names_out()
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         xfrm_array = self.ohe.transform(X)
         xfrm_df = _DF(xfrm_array, columns=self.cols, index=X.index)
@@ -105,9 +108,11 @@ class DFDummyTransformer(_TransformerMixin, _BaseEstimator):
 class DFStringTransformer(_TransformerMixin, _BaseEstimator):
     """Class for string conversion step in sklearn pipeline.
     """
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         X_str = X.applymap(str)
         return X_str
@@ -120,11 +125,13 @@ class DFImputer(_TransformerMixin, _BaseEstimator):
         self.imputer = imputer
         self.stats_ = None
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         self.imputer.fit(X)
         self.stats_ = _pd.Series(self.imputer.statistics_, index=X.columns)
         return self
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         X_imputed_array = self.imputer.transform(X)
         X_imputed_df = _DF(X_imputed_array, index=X.index, columns=X.columns)
@@ -137,10 +144,12 @@ class DFScaler(_TransformerMixin, _BaseEstimator):
     def __init__(self, scaler):
         self.scaler = scaler
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         self.scaler.fit(X)
         return self 
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         X_scaled_data = self.scaler.transform(X)
         X_scaled_df = _DF(X_scaled_data, index=X.index, columns=X.columns)
@@ -153,9 +162,11 @@ class DFDropNaN(_TransformerMixin, _BaseEstimator):
     def __init__(self, **kwargs):
         self.kwargs = kwargs
 
+    @_hpi.instrumented(rows_in='X')
     def fit(self, X, y=None):
         return self 
 
+    @_hpi.instrumented(rows_in='X', rows_out=True)
     def transform(self, X):
         return X.dropna(**self.kwargs)
         
\ No newline at end of file
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from Custom_Modules import hp_benchmark
+
+
+def test_synthetic_game_log_is_a_valid_schedule():
+    df = hp_benchmark.synthetic_game_log(100)
+
+    team_games = pd.concat([
+        df[['DT', 'N_GAMES', 'HOME_TEAM']].set_axis(['DT', 'N_GAMES', 'TEAM'], axis=1)
+        , df[['DT', 'N_GAMES', 'VISITING_TEAM']].set_axis(['DT', 'N_GAMES', 'TEAM'], axis=1)
+    ])
+
+    assert len(df) == 100
+    assert (df['HOME_TEAM'] != df['VISITING_TEAM']).all()
+    assert not team_games.duplicated().any()
+    assert df['DT'].is_monotonic_increasing
+
+
+def test_ingest_benchmark_runs_with_and_without_id_dict():
+    run = hp_benchmark.run_benchmarks(names=['retro_game_log_ingest', 'retro_game_log_ingest_id_dict'], scale=0.01, repeat=1)
+
+    for name in ('retro_game_log_ingest', 'retro_game_log_ingest_id_dict'):
+        assert run['results'][name]['n_items'] == 200
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Custom_Modules import hp_feature_store
+
+
+TEAMS = ['BOS', 'NYA', 'TBA', 'TOR', 'BAL', 'CLE']
+
+
+def _game_log(n_days=15, seed=0):
+    """A valid schedule: every team plays once a day, plus one doubleheader."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for day in range(n_days):
+        dt = 20220407 + day
+        teams = list(rng.permutation(TEAMS))
+        for home, visiting in zip(teams[::2], teams[1::2]):
+            n_games = [1, 2] if day == 5 and home == teams[0] else [0]
+            for game_num in n_games:
+                rows.append({
+                    'DT': dt, 'N_GAMES': game_num, 'HOME_TEAM': home, 'VISITING_TEAM': visiting
+                    , 'HOME_SCORE': int(rng.integers(0, 10)), 'VISITING_SCORE': int(rng.integers(0, 10))
+                    , 'HOME_OFF_HITS': int(rng.integers(0, 15)), 'VISITING_OFF_HITS': int(rng.integers(0, 15))
+                    , 'HOME_PIT_K': int(rng.integers(0, 15)), 'VISITING_PIT_K': int(rng.integers(0, 15))
+                })
+    return pd.DataFrame(rows)
+
+
+def _store(tmp_path, name, windows=(3, 5)):
+    return hp_feature_store.TeamFeatureStore(str(tmp_path / f"{name}.db"), windows=windows)
+
+
+def _assert_same_store(store, expected):
+    pd.testing.assert_frame_equal(store.history(), expected.history(), check_dtype=False)
+    pd.testing.assert_frame_equal(store.latest().sort_values('TEAM').reset_index(drop=True)
+        , expected.latest().sort_values('TEAM').reset_index(drop=True), check_dtype=False)
+
+
+@pytest.fixture
+def games():
+    return _game_log()
+
+
+@pytest.fixture
+def full_store(tmp_path, games):
+    store = _store(tmp_path, 'full')
+    store.update(games)
+    return store
+
+
+def test_day_by_day_matches_full_load(tmp_path, games, full_store):
+    store = _store(tmp_path, 'daily')
+    days = sorted(games['DT'].unique())
+    late_day = days[4]
+
+    for dt in days:
+        if dt != late_day:
+            store.update(games[games['DT'] == dt])
+    store.update(games.iloc[:0])  # off day
+    assert store.update(games[games['DT'] == late_day]) == 2 * (games['DT'] == late_day).sum()
+    assert store.update(games[games['DT'] == days[-1]]) == 0  # re-sent day
+
+    _assert_same_store(store, full_store)
+
+
+def test_empty_update_on_new_store(tmp_path, games):
+    store = _store(tmp_path, 'empty')
+
+    assert store.update(games.iloc[:0]) == 0
+    assert store.lookup('BOS') is None
+
+
+def test_corrected_day_replaces_stored_games(tmp_path, games):
+    store = _store(tmp_path, 'corrected')
+    store.update(games)
+    assert store.lookup('BOS') is not None  # fill the lookup cache
+
+    corrected = games.copy()
+    day = corrected['DT'] == sorted(games['DT'].unique())[6]
+    corrected.loc[day, 'HOME_SCORE'] += 5
+
+    assert store.update(corrected[day]) == 2 * day.sum()
+
+    expected = _store(tmp_path, 'expected')
+    expected.update(corrected)
+    _assert_same_store(store, expected)
+    assert store.lookup('BOS') == expected.lookup('BOS')
+
+
+def test_last_copy_wins_within_batch(tmp_path, games):
+    store = _store(tmp_path, 'batch')
+    first_game = games.iloc[[0]]
+    resent = first_game.assign(HOME_SCORE=first_game['HOME_SCORE'] + 5)
+
+    store.update(pd.concat([first_game, resent]))
+
+    expected = _store(tmp_path, 'expected')
+    expected.update(resent)
+    _assert_same_store(store, expected)
+
+
+def test_history_only_uses_prior_games(games, full_store):
+    records = hp_feature_store.team_game_records(games)
+    wins = records[records['TEAM'] == 'BOS']['WIN'].to_numpy()
+
+    history = full_store.history(team='BOS')
+
+    assert np.isnan(history['WIN_L3'].iloc[0])
+    expected = [wins[max(i - 3, 0):i].mean() for i in range(1, len(wins))]
+    np.testing.assert_allclose(history['WIN_L3'].iloc[1:], expected)
+
+
+def test_lookup_includes_latest_game(games, full_store):
+    records = hp_feature_store.team_game_records(games)
+    wins = records[records['TEAM'] == 'BOS']['WIN'].to_numpy()
+
+    assert full_store.lookup('BOS')['WIN_L3'] == pytest.approx(wins[-3:].mean())
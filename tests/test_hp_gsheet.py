@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+gspread = pytest.importorskip('gspread')
+from gspread.exceptions import SpreadsheetNotFound
+from gspread.utils import a1_range_to_grid_range
+
+from Custom_Modules import hp_gsheet
+
+
+class FakeWorksheet:
+    """Keeps cell values in a grid the way the Sheets API stores RAW input."""
+
+    def __init__(self, rows=10, cols=3):
+        self.grid = []
+        self.row_count = rows
+        self.col_count = cols
+        self.batches = []
+
+    def get_all_values(self, value_render_option=None):
+        assert value_render_option == 'UNFORMATTED_VALUE'
+        values = [list(row) for row in self.grid]
+        while values and not any(v != '' for v in values[-1]):
+            values.pop()
+        width = max([max([j + 1 for j, v in enumerate(row) if v != ''] or [0]) for row in values] or [0])
+        return [(row + [''] * width)[:width] for row in values]
+
+    def resize(self, rows, cols):
+        self.row_count, self.col_count = rows, cols
+
+    def clear(self):
+        self.grid = []
+
+    def batch_update(self, data, value_input_option=None):
+        assert value_input_option == 'RAW'
+        self.batches.append([d['range'] for d in data])
+        for d in data:
+            grid_range = a1_range_to_grid_range(d['range'])
+            for i, row in enumerate(d['values']):
+                r = grid_range['startRowIndex'] + i
+                while len(self.grid) <= r:
+                    self.grid.append([])
+                for j, v in enumerate(row):
+                    c = grid_range['startColumnIndex'] + j
+                    while len(self.grid[r]) <= c:
+                        self.grid[r].append('')
+                    self.grid[r][c] = v
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.sheet1 = FakeWorksheet()
+
+
+class FakeClient:
+    def __init__(self):
+        self.spreadsheets = {}
+
+    def open(self, name):
+        if name not in self.spreadsheets:
+            raise SpreadsheetNotFound
+        return self.spreadsheets[name]
+
+    def create(self, name):
+        self.spreadsheets[name] = FakeSpreadsheet()
+        return self.spreadsheets[name]
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'A': range(12), 'B': np.arange(12) * 1.5, 'C': ['x'] * 12})
+
+
+def _write(df, gc, **kwargs):
+    n_cells = hp_gsheet.df_to_gsheet(df, 'test', gc=gc, **kwargs)
+    return n_cells, gc.spreadsheets['test'].sheet1
+
+
+def test_full_write_is_chunked(df):
+    gc = FakeClient()
+
+    n_cells, sheet = _write(df, gc, chunk_rows=5)
+
+    assert n_cells == 13 * 3
+    assert sheet.batches == [['A1:C5'], ['A6:C10'], ['A11:C13']]
+    assert sheet.get_all_values(value_render_option='UNFORMATTED_VALUE') == hp_gsheet.df_to_values(df)
+
+
+def test_sync_sends_only_changed_cells(df):
+    gc = FakeClient()
+    _, sheet = _write(df, gc)
+    sheet.batches = []
+
+    edited = df.copy()
+    edited.loc[3, 'B'] = 99
+    edited.loc[4, 'B'] = 98
+    edited.loc[9, 'C'] = np.nan
+    n_cells, sheet = _write(edited, gc, sync=True)
+
+    assert n_cells == 3
+    assert sheet.batches == [['B5:B6', 'C11:C11']]
+    assert sheet.get_all_values(value_render_option='UNFORMATTED_VALUE') == hp_gsheet.df_to_values(edited)
+
+
+def test_sync_blanks_cells_when_frame_shrinks(df):
+    gc = FakeClient()
+    _write(df, gc)
+
+    smaller = df.iloc[:8, :2]
+    _, sheet = _write(smaller, gc, sync=True)
+
+    assert sheet.get_all_values(value_render_option='UNFORMATTED_VALUE') == hp_gsheet.df_to_values(smaller)
+
+
+def test_noop_sync_sends_nothing(df):
+    gc = FakeClient()
+    _, sheet = _write(df, gc)
+    sheet.batches = []
+
+    n_cells, sheet = _write(df, gc, sync=True)
+
+    assert n_cells == 0
+    assert sheet.batches == []
+
+
+def test_noop_sync_with_values_sheets_would_reformat():
+    # long floats, timestamps and zero-padded strings display differently than str(v)
+    predictions = pd.DataFrame({
+        'GAME_ID': ['007', '010']
+        , 'WIN_PROB': [0.5123456789012345, 1 / 3]
+        , 'START': pd.to_datetime(['2022-04-07 19:05', '2022-04-08 13:10'])
+        , 'HOME': [True, False]
+    })
+    gc = FakeClient()
+    _, sheet = _write(predictions, gc)
+    sheet.batches = []
+
+    n_cells, sheet = _write(predictions, gc, sync=True)
+
+    assert n_cells == 0
+    assert sheet.grid[1][0] == '007'
+
+
+def test_df_to_values_normalises_cells():
+    df = pd.DataFrame({
+        'I': pd.array([1, None], dtype='Int64')
+        , 'F': [2.0, np.nan]
+        , 'B': [True, False]
+        , 'S': ['a', None]
+    })
+
+    values = hp_gsheet.df_to_values(df)
+
+    assert values == [['I', 'F', 'B', 'S'], [1, 2, True, 'a'], ['', '', False, '']]
+    assert type(values[1][0]) is int and type(values[1][1]) is int
+
+
+def test_diff_ranges_merges_rows_with_same_span():
+    old = [['a', 'b', 'c'], ['1', '2', '3'], ['4', '5', '6'], ['7', '8', '9']]
+    new = [['a', 'b', 'c'], ['1', 'X', '3'], ['4', 'Y', '6'], ['7', '8']]
+
+    assert hp_gsheet.diff_ranges(old, new) == [(1, 1, [['X'], ['Y']]), (3, 2, [['']])]
+
+
+def test_diff_ranges_treats_type_change_as_change():
+    assert hp_gsheet.diff_ranges([[1]], [[True]]) == [(0, 0, [[True]])]
+    assert hp_gsheet.diff_ranges([[1]], [[1]]) == []
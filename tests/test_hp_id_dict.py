@@ -0,0 +1,122 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sqlalchemy')
+
+from Custom_Modules import hp_id_dict, hp_sqlite
+
+
+@pytest.fixture
+def games():
+    # one name per ID, so names survive the round trip
+    return pd.DataFrame({
+        'DT': [20220407, 20220407, 20220408]
+        , 'HOME_SCORE': [3, 5, 1]
+        , 'HP_UMP_ID': ['westj901', 'cuzzp901', 'westj901']
+        , 'HP_UMP_NAME': ['Joe West', 'Phil Cuzzi', 'Joe West']
+        , 'HOME_STARTING_PITCHER_ID': ['colea001', '', 'verlj001']
+        , 'HOME_STARTING_PITCHER_NAME': ['Gerrit Cole', '', 'Justin Verlander']
+    })
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'retro.db')
+
+
+def _expected(games):
+    return games.replace({'': np.nan})
+
+
+def test_round_trip_through_sqlite(games, db_path):
+    id_dict = hp_id_dict.RetroIdDict(db_path)
+    hp_sqlite.df_to_sqlite(games, db_path, 'GAME_LOG', id_dict=id_dict)
+
+    with sqlite3.connect(db_path) as conn:
+        stored = pd.read_sql_query("SELECT * FROM GAME_LOG", conn)
+    assert list(stored.columns) == ['DT', 'HOME_SCORE', 'HP_UMP_ID', 'HOME_STARTING_PITCHER_ID']
+    assert stored['HOME_STARTING_PITCHER_ID'].tolist() == [2, -1, 3]
+
+    df = hp_sqlite.sql_to_df(db_path, "SELECT * FROM GAME_LOG", id_dict=hp_id_dict.RetroIdDict(db_path))
+
+    pd.testing.assert_frame_equal(df, _expected(games), check_dtype=False)
+
+
+def test_codes_are_shared_across_writes(games, db_path):
+    hp_sqlite.df_to_sqlite(games.iloc[:2], db_path, 'GAME_LOG', id_dict=hp_id_dict.RetroIdDict(db_path))
+    hp_sqlite.df_to_sqlite(games.iloc[2:], db_path, 'GAME_LOG', if_exists='append', id_dict=hp_id_dict.RetroIdDict(db_path))
+
+    df = hp_sqlite.sql_to_df(db_path, "SELECT * FROM GAME_LOG", id_dict=hp_id_dict.RetroIdDict(db_path))
+
+    pd.testing.assert_frame_equal(df, _expected(games), check_dtype=False)
+
+
+def test_numeric_id_columns_are_not_decoded(games, db_path):
+    id_dict = hp_id_dict.RetroIdDict(db_path)
+    hp_sqlite.df_to_sqlite(games, db_path, 'GAME_LOG', id_dict=id_dict)
+    parks = pd.DataFrame({'PARK_ID': [1, 2, 3], 'HP_UMP_ID': [0, 1, 99]})
+    hp_sqlite.df_to_sqlite(parks, db_path, 'PARKS')
+
+    df = hp_sqlite.sql_to_df(db_path, "SELECT PARK_ID FROM PARKS", id_dict=id_dict)
+    assert df['PARK_ID'].tolist() == [1, 2, 3]
+
+    df = hp_sqlite.sql_to_df(db_path, "SELECT * FROM PARKS", id_dict=id_dict, id_table='PARKS')
+    pd.testing.assert_frame_equal(df, parks)
+
+
+def test_encode_leaves_numeric_id_columns_alone():
+    id_dict = hp_id_dict.RetroIdDict()
+    df = pd.DataFrame({'GAME_ID': [10, 11], 'HP_UMP_ID': ['westj901', 'cuzzp901']})
+
+    encoded = id_dict.encode(df)
+
+    assert encoded['GAME_ID'].tolist() == [10, 11]
+    assert hp_id_dict.encoded_cols(encoded) == ['HP_UMP_ID']
+    pd.testing.assert_frame_equal(id_dict.decode(encoded), df, check_dtype=False)
+
+
+def test_decode_rejects_unknown_codes():
+    id_dict = hp_id_dict.RetroIdDict()
+    id_dict.encode_ids(['westj901'])
+
+    with pytest.raises(ValueError, match='HP_UMP_ID'):
+        id_dict.decode(pd.DataFrame({'HP_UMP_ID': np.array([0, 5])}), cols=['HP_UMP_ID'])
+
+
+def test_first_name_seen_is_kept():
+    id_dict = hp_id_dict.RetroIdDict()
+    df = pd.DataFrame({'HP_UMP_ID': ['westj901', 'westj901'], 'HP_UMP_NAME': ['Joe West', 'J. West']})
+
+    decoded = id_dict.decode(id_dict.encode(df))
+
+    assert decoded['HP_UMP_NAME'].tolist() == ['Joe West', 'Joe West']
+
+
+def test_saving_to_a_db_with_other_codes_raises(games, tmp_path):
+    db_a, db_b = str(tmp_path / 'a.db'), str(tmp_path / 'b.db')
+    dict_b = hp_id_dict.RetroIdDict()
+    dict_b.encode_ids(['smitj001', 'jonej001', 'browj001', 'whitj001'])
+    dict_b.save(db_b)
+
+    dict_a = hp_id_dict.RetroIdDict(db_a)
+    dict_a.encode(games)  # same number of IDs as db b, different codes
+    dict_a.save(db_a)
+
+    assert len(dict_a) == len(dict_b)
+    with pytest.raises(ValueError, match='different codes'):
+        dict_a.save(db_b)
+
+
+def test_saving_extends_a_db_with_the_same_codes(games, tmp_path):
+    db_a, db_b = str(tmp_path / 'a.db'), str(tmp_path / 'b.db')
+    id_dict = hp_id_dict.RetroIdDict(db_a)
+    id_dict.encode(games.iloc[:1])
+    id_dict.save(db_b)  # empty db
+
+    id_dict.encode(games)
+    id_dict.save(db_b)  # db holds the first codes of this dictionary
+
+    assert hp_id_dict.RetroIdDict(db_b).ids == id_dict.ids
@@ -0,0 +1,121 @@
+import logging
+import threading
+import tracemalloc
+
+import pytest
+
+from Custom_Modules import hp_instrument
+
+
+@hp_instrument.instrumented(rows_in='rows', rows_out=True)
+def _double(rows):
+    return rows + rows
+
+
+@hp_instrument.instrumented()
+def _outer(n_bytes):
+    hp_instrument.add_bytes(1)
+    _inner(n_bytes)
+    return bytearray(n_bytes)
+
+
+@hp_instrument.instrumented()
+def _inner(n_bytes):
+    hp_instrument.add_bytes(10)
+    hp_instrument.note(inner_n=n_bytes)
+    return bytearray(n_bytes)
+
+
+@hp_instrument.instrumented()
+def _fails():
+    raise KeyError('boom')
+
+
+@hp_instrument.instrumented()
+def _allocate_when_ready(n_bytes, barrier):
+    barrier.wait()
+    data = bytearray(n_bytes)
+    barrier.wait()
+    return len(data)
+
+
+def _broken_sink(record):
+    raise RuntimeError('sink is down')
+
+
+def test_disabled_calls_emit_nothing():
+    sink = hp_instrument.MemorySink()
+    hp_instrument.disable()
+
+    assert _double([1, 2]) == [1, 2, 1, 2]
+    assert sink.records == []
+    assert not hp_instrument.is_enabled()
+
+
+def test_rows_in_and_out():
+    sink = hp_instrument.MemorySink()
+
+    with hp_instrument.instrumentation(sink):
+        _double([1, 2, 3])
+
+    assert not hp_instrument.is_enabled()
+    assert sink.records[0]['name'] == 'test_hp_instrument._double'
+    assert (sink.records[0]['rows_in'], sink.records[0]['rows_out']) == (3, 6)
+
+
+def test_nested_calls_get_their_own_records():
+    sink = hp_instrument.MemorySink()
+
+    with hp_instrument.instrumentation(sink, trace_memory=True):
+        _outer(1000)
+
+    inner, outer = sink.records
+    assert (inner['name'], outer['name']) == ('test_hp_instrument._inner', 'test_hp_instrument._outer')
+    assert (inner['bytes'], outer['bytes']) == (10, 1)
+    assert inner['inner_n'] == 1000 and 'inner_n' not in outer
+    assert inner['peak_mem_bytes'] is None  # only the outermost call is traced
+    assert outer['peak_mem_bytes'] >= 1000
+    assert not tracemalloc.is_tracing()
+
+
+def test_broken_sink_does_not_change_the_call(caplog):
+    sink = hp_instrument.MemorySink()
+
+    with hp_instrument.instrumentation(_broken_sink, sink), caplog.at_level(logging.WARNING, 'hakuna_patata'):
+        assert _double([1]) == [1, 1]
+        with pytest.raises(KeyError):
+            _fails()
+
+    assert [r['error'] for r in sink.records] == [None, 'KeyError']
+    assert [r.levelname for r in caplog.records] == ['WARNING', 'WARNING']
+
+
+def test_overlapping_traced_calls_record_none():
+    sink = hp_instrument.MemorySink()
+    barrier = threading.Barrier(2)
+    threads = [threading.Thread(target=_allocate_when_ready, args=(n, barrier)) for n in (5_000_000, 1_000_000)]
+
+    with hp_instrument.instrumentation(sink, trace_memory=True):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        solo_size = _allocate_when_ready(2_000_000, threading.Barrier(1))
+
+    assert solo_size == 2_000_000
+    assert [r['peak_mem_bytes'] for r in sink.records[:2]] == [None, None]
+    assert sink.records[2]['peak_mem_bytes'] >= 2_000_000
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    sink = hp_instrument.MemorySink()
+    tracemalloc.start()
+    try:
+        with hp_instrument.instrumentation(sink, trace_memory=True):
+            _inner(1000)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    assert sink.records[0]['peak_mem_bytes'] >= 1000
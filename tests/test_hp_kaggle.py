@@ -0,0 +1,199 @@
+import io
+import os
+import time
+import hashlib
+import threading
+from types import SimpleNamespace
+from zipfile import ZipFile
+
+import pytest
+
+from Custom_Modules import hp_kaggle, hp_instrument
+
+
+class FakeKaggleApi:
+    """Stands in for KaggleApi: serves files from a dict and records every download call."""
+
+    def __init__(self, files, zipped=(), delay=0.0):
+        self.files = dict(files)
+        self.zipped = set(zipped)
+        self.delay = delay
+        self.calls = []
+        self.skip_when_present = False  # mimic the client's own "local copy is newer" skip
+        self.bad_downloads = {}  # file_name -> number of corrupt downloads before a good one
+        self.raise_for = {}  # file_name -> exception to raise
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def dataset_list_files(self, dataset):
+        return SimpleNamespace(files=[SimpleNamespace(name=name, totalBytes=len(data))
+            for name, data in self.files.items() if name not in self.zipped])
+
+    def dataset_download_file(self, dataset, file_name, path, force, quiet):
+        with self._lock:
+            self.calls.append((file_name, force))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if file_name in self.raise_for:
+                raise self.raise_for[file_name]
+
+            out_path = os.path.join(path, file_name + ('.zip' if file_name in self.zipped else ''))
+            if self.skip_when_present and not force and os.path.exists(out_path):
+                return False
+
+            data = self.files[file_name]
+            if self.bad_downloads.get(file_name, 0) > 0:
+                self.bad_downloads[file_name] -= 1
+                data = b'corrupt'
+            if file_name in self.zipped:
+                buffer = io.BytesIO()
+                with ZipFile(buffer, 'w') as zf:
+                    zf.writestr(file_name, data)
+                data = buffer.getvalue()
+
+            with open(out_path, 'wb') as f:
+                f.write(data)
+            return True
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.fixture
+def files():
+    return {'a.csv': b'1,2\n' * 100, 'b.csv': b'x' * 50}
+
+
+def test_skips_file_with_matching_size(tmp_path, files):
+    (tmp_path / 'a.csv').write_bytes(files['a.csv'])
+    api = FakeKaggleApi(files)
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', files, str(tmp_path))
+
+    assert results == {'a.csv': 'skipped', 'b.csv': 'downloaded'}
+    assert [name for name, _ in api.calls] == ['b.csv']
+
+
+def test_partial_file_is_handed_to_client_without_force(tmp_path, files):
+    (tmp_path / 'b.csv').write_bytes(files['b.csv'][:10])
+    api = FakeKaggleApi(files)
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['b.csv'], str(tmp_path))
+
+    assert results == {'b.csv': 'downloaded'}
+    assert api.calls == [('b.csv', False)]
+    assert (tmp_path / 'b.csv').read_bytes() == files['b.csv']
+
+
+def test_skips_file_with_matching_md5(tmp_path, files):
+    (tmp_path / 'a.csv').write_bytes(files['a.csv'])
+    api = FakeKaggleApi(files)
+    api.files['a.csv'] = b'different size, but the checksum decides'
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['a.csv'], str(tmp_path)
+        , checksums={'a.csv': _md5(files['a.csv'])})
+
+    assert results == {'a.csv': 'skipped'}
+    assert api.calls == []
+
+
+def test_checksum_mismatch_forces_one_retry(tmp_path, files):
+    api = FakeKaggleApi(files)
+    api.bad_downloads['a.csv'] = 1
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['a.csv'], str(tmp_path)
+        , checksums={'a.csv': _md5(files['a.csv'])})
+
+    assert results == {'a.csv': 'downloaded'}
+    assert api.calls == [('a.csv', False), ('a.csv', True)]
+
+
+def test_checksum_mismatch_after_retry_is_failed(tmp_path, files, capsys):
+    api = FakeKaggleApi(files)
+    api.bad_downloads['a.csv'] = 2
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', files, str(tmp_path)
+        , checksums={'a.csv': _md5(files['a.csv'])})
+
+    assert results == {'a.csv': 'failed', 'b.csv': 'downloaded'}
+    assert api.calls.count(('a.csv', True)) == 1
+    assert "ERROR: a.csv failed checksum verification!" in capsys.readouterr().out
+
+
+def test_client_skip_is_reported_as_skipped(tmp_path):
+    # zipped files can't be size-checked locally, so the client decides
+    api = FakeKaggleApi({'c.csv': b'zipped'}, zipped={'c.csv'})
+    api.skip_when_present = True
+    hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['c.csv'], str(tmp_path))
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['c.csv'], str(tmp_path))
+
+    assert results == {'c.csv': 'skipped'}
+    assert api.calls == [('c.csv', False), ('c.csv', False)]
+
+
+def test_download_error_only_fails_that_file(tmp_path, files, capsys):
+    api = FakeKaggleApi(files)
+    api.raise_for['a.csv'] = RuntimeError('404 Not Found')
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', files, str(tmp_path))
+
+    assert results == {'a.csv': 'failed', 'b.csv': 'downloaded'}
+    assert "ERROR: a.csv failed to download (RuntimeError: 404 Not Found)!" in capsys.readouterr().out
+
+
+def test_concurrency_bounded_by_max_workers(tmp_path):
+    files = {f"f{i}.csv": b'x' * i for i in range(1, 9)}
+    api = FakeKaggleApi(files, delay=0.05)
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', files, str(tmp_path), max_workers=3)
+
+    assert set(results.values()) == {'downloaded'}
+    assert api.max_active == 3
+
+
+def test_unzip_only_extracts_new_downloads(tmp_path):
+    api = FakeKaggleApi({'new.csv': b'new', 'old.csv': b'old'}, zipped={'new.csv', 'old.csv'})
+    api.skip_when_present = True
+    hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['old.csv'], str(tmp_path))
+
+    results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['new.csv', 'old.csv'], str(tmp_path), unzip=True)
+
+    assert results == {'new.csv': 'downloaded', 'old.csv': 'skipped'}
+    assert (tmp_path / 'new.csv').read_bytes() == b'new'
+    assert not (tmp_path / 'old.csv').exists()
+
+
+def test_bytes_recorded_on_entry_point_record(tmp_path, files):
+    api = FakeKaggleApi(files)
+    sink = hp_instrument.MemorySink()
+
+    with hp_instrument.instrumentation(sink):
+        hp_kaggle.kaggle_dataset_download(api, 'owner/ds', files, str(tmp_path))
+
+    assert [r['name'] for r in sink.records] == ['hp_kaggle.kaggle_dataset_download']
+    assert sink.records[0]['bytes'] == sum(len(data) for data in files.values())
+
+
+def test_unexpected_saved_name_does_not_break_download(tmp_path):
+    api = FakeKaggleApi({'my file.csv': b'data'})
+    download = api.dataset_download_file
+
+    def _save_url_quoted(dataset, file_name, path, force, quiet):
+        download(dataset, file_name, path, force, quiet)
+        os.rename(os.path.join(path, file_name), os.path.join(path, file_name.replace(' ', '%20')))
+        return True
+
+    api.dataset_download_file = _save_url_quoted
+
+    with hp_instrument.instrumentation(hp_instrument.MemorySink()):
+        results = hp_kaggle.kaggle_dataset_download(api, 'owner/ds', ['my file.csv'], str(tmp_path))
+
+    assert results == {'my file.csv': 'downloaded'}